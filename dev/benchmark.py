@@ -19,9 +19,32 @@ import emnes  # noqa
 
 parser = argparse.ArgumentParser(description="NES emulator")
 parser.add_argument("--nb-runs", "-n", type=int, default=1, help="number of times to run the rom")
+parser.add_argument(
+    "--no-jit-warmup", action="store_true", help="do not warm up the JIT before timing"
+)
 
 args = parser.parse_args()
 
+# Signature written at 0x6001-0x6003 by the blargg test roms once the tests are running.
+SIG = b"\xDE\xB0\x61"
+# Number of instructions to emulate to warm up the JIT.
+JIT_WARMUP_INSTRUCTIONS = 100000
+# Clock rate of the NTSC NES's CPU, in Hz.
+REAL_CPU_CLOCK_RATE = 1789773
+
+
+def has_jit():
+    """
+    Indicates if the interpreter compiles hot code.
+
+    :returns: True when running on PyPy or on a CPython 3.13+ build with the
+        experimental JIT enabled.
+    """
+    if "PyPy" in sys.version:
+        return True
+    jit = getattr(sys, "_jit", None)
+    return jit is not None and jit.is_enabled()
+
 
 def print_cartridge_info(cart):
     """
@@ -49,70 +72,94 @@ def get_output_from_0x6400(bus):
 
     :returns: String at 0x6400.
     """
-    i = 0
-    while bus.read_byte(0x6004 + i) != 0:
-        i += 1
-    return bus.read_array(0x6004, i).decode("utf-8")
+    # Instead of testing one byte at a time for the terminating null character,
+    # read windows of increasing size and let find scan for it. The string can't go
+    # past the end of SRAM, so never read past 0x7FFF.
+    max_length = 0x8000 - 0x6004
+    length = 256
+    while True:
+        data = bus.read_array(0x6004, length)
+        end = data.find(0)
+        if end != -1:
+            return data[:end].decode("utf-8")
+        if length == max_length:
+            return data.decode("utf-8")
+        length = min(length * 2, max_length)
 
 
 def main():
     """
     Runs the blargg rom test.
     """
-    nes = emnes.nes.NES()
-    nes.load_rom(
-        os.path.join(
-            os.path.dirname(__file__),
-            *"../tests/roms/cpu/instructions/blargg/official_only.nes".split("/"),
-        )
+    rom_path = os.path.join(
+        os.path.dirname(__file__),
+        *"../tests/roms/cpu/instructions/blargg/official_only.nes".split("/"),
     )
+    # Read the rom only once so runs don't have to go back to the disk.
+    with open(rom_path, "rb") as fh:
+        rom_data = fh.read()
+
+    nes = emnes.nes.NES()
+    nes.load_rom_data(rom_data, rom_path)
     print_cartridge_info(nes.cartridge)
 
+    # JITs only compile a loop after it has run for a while, so the first
+    # instructions run a lot slower. Emulate a bit before starting the clock and
+    # reload the rom so the timed runs only measure optimized code.
+    if has_jit() and not args.no_jit_warmup:
+        print("Warming up the JIT")
+        for _ in range(JIT_WARMUP_INSTRUCTIONS):
+            nes.emulate_once()
+        nes.load_rom_data(rom_data, rom_path)
+
     before = time.time()
     nb_instructions = 0
     nb_cycles = 0
+    status = None
 
     for i in range(args.nb_runs):
         single_run_start = time.time()
+        # Reloading the ROM creates a new memory bus and CPU, so those need to be fetched on
+        # every run.
+        emulate_once = nes.emulate_once
+        read_byte = nes.memory_bus.read_byte
+        read_array = nes.memory_bus.read_array
         # The Blarg test suites initializes memory 0x6001-0x6003 to let the test
         # running the emulator that the result at 0x6000 can be read to interpret
         # the result of the tests. So loop until we reach that milestone.
-        while (
-            nes.memory_bus.read_byte(0x6001) != 0xDE
-            and nes.memory_bus.read_byte(0x6002) != 0xB0
-            and nes.memory_bus.read_byte(0x6003) != 0x61
-        ):
-            nes.emulate_once()
+        while read_array(0x6001, 3) != SIG:
+            emulate_once()
             nb_instructions += 1
 
         # Now that we know that the tests are actually running, we can start monitoring
         # 0x6000. 0x00 means success, 0x01 - 0x7F means error, 0x80 and higher means running
-        while nes._memory_bus.read_byte(0x6000) >= 0x80:
-            nes.emulate_once()
+        while read_byte(0x6000) >= 0x80:
+            emulate_once()
             nb_instructions += 1
 
-        if nes.memory_bus.read_byte(0x6000) != 0:
+        status = read_byte(0x6000)
+        if status != 0:
             print(get_output_from_0x6400(nes.memory_bus))
             return
 
-        # Power cycling the emulator resets the cycle count so keep track of the number of cycles.
+        # Reloading the ROM creates a new CPU, which resets the cycle count, so keep track of the
+        # number of cycles.
         nb_cycles += nes.cpu.nb_cycles
 
         print(f"Run #{i} completed in {time.time() - single_run_start}.")
 
-        # Do a full power cycle when the tests are done executing so we can reset the memory
-        # content
-        nes.power()
+        # Reload the cartridge when the tests are done executing so we can reset the memory
+        # content. Unlike a power cycle, this also resets the mapper's state.
+        nes.load_rom_data(rom_data, rom_path)
 
     elapsed = time.time() - before
-    real_cpu_clock_rate = 1789773
     cycles_per_second = nb_cycles / elapsed
     print("===================================")
-    print(f"Result: {nes._memory_bus.read_byte(0x6000)}")
+    print(f"Result: {status}")
     print(f"Instructions: {nb_instructions}")
     print(f"Cycles: {nb_cycles}")
     print(f"Cycles per second: {cycles_per_second}")
-    print(f"Emulated to Real speed ratio: {cycles_per_second / real_cpu_clock_rate}")
+    print(f"Emulated to Real speed ratio: {cycles_per_second / REAL_CPU_CLOCK_RATE}")
     print(f"Elapsed: {elapsed} seconds")
     print(f"Average: {elapsed / args.nb_runs} seconds")
 
@@ -6,11 +6,16 @@
 # See LICENSE at the root of this project for more info.
 
 import os
+import struct
 
 from emnes.mirroring_type import MirroringType
 from emnes.readers.cartridge_header import CartridgeHeader
 from emnes.mappers import MapperRegistry
 
+# Header bytes 4 to 8: number of ROM banks, number of VROM banks, ROM control bytes 1 & 2
+# and number of SRAM banks.
+_header_struct = struct.Struct("5B")
+
 
 class CartridgeReader:
     """
@@ -40,18 +45,21 @@ class CartridgeReader:
 
         :returns: Tuple of (CartridgeHeader, the mapper index, the ROM data)
         """
-        nes_string = cart_data[0:4]
-
         # iNES rom format should start with NES
-        if nes_string != b"NES\x1a":
+        if not cart_data.startswith(b"NES\x1a"):
             raise RuntimeError("Emulator only supports ROMs in the iNes format.")
 
-        nb_rom_banks = cart_data[4]
-        nb_vrom_banks = cart_data[5]
-        is_battery_backed = True if cart_data[6] & 2 else False
-        has_trainer = True if cart_data[6] & 4 else False
+        # Unpack the rest of the header in one go instead of indexing each byte.
+        (
+            nb_rom_banks,
+            nb_vrom_banks,
+            rom_control_byte_1,
+            rom_control_byte_2,
+            nb_sram_banks,
+        ) = _header_struct.unpack_from(cart_data, 4)
 
-        rom_control_byte_1 = cart_data[6]
+        is_battery_backed = True if rom_control_byte_1 & 2 else False
+        has_trainer = True if rom_control_byte_1 & 4 else False
 
         if rom_control_byte_1 & (1 << 3):
             mirroring_type = MirroringType.FourScreen
@@ -60,17 +68,16 @@ class CartridgeReader:
         else:
             mirroring_type = MirroringType.Horizontal
 
-        rom_control_byte_2 = cart_data[7]
-
         mapper_number = (rom_control_byte_1 >> 4) | (rom_control_byte_2 & 0b11110000)
 
-        nb_sram_banks = cart_data[8]
         if nb_sram_banks == 0:
             nb_sram_banks = 1
 
         rom_data_start = 16 + (512 if has_trainer else 0)
 
-        rom_data = cart_data[rom_data_start:]
+        # The mapper copies the ROM and VROM out of this data, so hand out a view on it
+        # instead of a slice, which would copy them a second time.
+        rom_data = memoryview(cart_data)[rom_data_start:]
 
         header = CartridgeHeader(
             path,
@@ -6,6 +6,80 @@
 # See LICENSE at the root of this project for more info.
 
 import enum
+import linecache
+from array import array
+
+# Bits of the status register.
+CARRY = 0x01
+ZERO = 0x02
+INTERRUPT_DISABLED = 0x04
+# This flag is implemented, but the NES CPU doesn't support decimal mode
+DECIMAL_MODE = 0x08
+OVERFLOW = 0x40
+NEGATIVE = 0x80
+
+# Zero and negative bits of the status register for each byte value, so both flags can be
+# updated with a single lookup.
+_NZ = bytes((ZERO if i == 0 else 0) | (i & NEGATIVE) for i in range(256))
+
+# Signed value of each byte, i.e. values between 128 and 255 are remapped to -128 to -1.
+_SIGNED_BYTE = tuple(i if i < 128 else i - 256 for i in range(256))
+
+# Each byte value incremented and decremented by one, wrapping around at the byte boundary.
+_INC8 = bytes((i + 1) & 0xFF for i in range(256))
+_DEC8 = bytes((i - 1) & 0xFF for i in range(256))
+
+
+def _build_adc_table():
+    """
+    Build the table of results of the ADC instruction.
+
+    SBC uses it as well, since subtracting a value is the same as adding its complement.
+
+    :returns: Array indexed by ``accumulator << 9 | value << 1 | carry``. The low byte of
+        each entry is the result and the high byte holds the carry, zero, overflow and
+        negative flags.
+    """
+    table = array("H", bytes(2 * 0x20000))
+    for accumulator in range(256):
+        for value in range(256):
+            for carry in range(2):
+                result = accumulator + value + carry
+                signed_result = _SIGNED_BYTE[accumulator] + _SIGNED_BYTE[value] + carry
+                # Bit 8 of the result is the carry.
+                flags = _NZ[result & 0xFF] | (result >> 8)
+                if signed_result < -128 or signed_result > 127:
+                    flags |= OVERFLOW
+                table[(accumulator << 9) | (value << 1) | carry] = (result & 0xFF) | (flags << 8)
+    return table
+
+
+def _build_shift_table(shift):
+    """
+    Build the table of results of a shift or rotate instruction.
+
+    :param function shift: Function taking a value and the carry, returning the shifted
+        value and the new carry.
+
+    :returns: Array indexed by ``value << 1 | carry``. The low byte of each entry is the
+        result and the high byte holds the carry, zero and negative flags.
+    """
+    table = array("H", bytes(2 * 512))
+    for value in range(256):
+        for carry in range(2):
+            result, carry_out = shift(value, carry)
+            table[(value << 1) | carry] = result | ((_NZ[result] | carry_out) << 8)
+    return table
+
+
+# Results of the arithmetic and shift instructions, so their result and flags can be
+# computed with a single lookup.
+_ADC = _build_adc_table()
+# The bit shifted out of the value goes into the carry.
+_ASL = _build_shift_table(lambda value, carry: ((value << 1) & 0xFF, value >> 7))
+_LSR = _build_shift_table(lambda value, carry: (value >> 1, value & 0x01))
+_ROL = _build_shift_table(lambda value, carry: (((value << 1) & 0xFF) | carry, value >> 7))
+_ROR = _build_shift_table(lambda value, carry: ((value >> 1) | (carry << 7), value & 0x01))
 
 
 class InterruptState(enum.IntEnum):
@@ -21,6 +95,20 @@ class InterruptState(enum.IntEnum):
     RESET = 2
 
 
+def _opcode(*opcodes):
+    """
+    Register a CPU method as the handler of one or more opcodes.
+
+    :param int opcodes: Opcodes handled by the method.
+    """
+
+    def register(method):
+        method._handled_opcodes = opcodes
+        return method
+
+    return register
+
+
 class CPU:
     """
     Brain of the emulator. You can call emulate to execute an instruction.
@@ -34,23 +122,27 @@ class CPU:
         "_accumulator",
         "_index_x",
         "_index_y",
-        "_program_counter",
-        "_stack_pointer",
-        ############################################################################################
-        # Status register bits
-        "_carry_flag",
-        "_zero_flag",
-        "_interrupt_disabled_flag",
-        # This flag is implemented, but the NES CPU doesn't support decimal mode
-        "_decimal_mode_flag",
-        "_overflow_flag",
-        "_negative_flag",
+        # The program counter and stack pointer are read from outside the CPU all the time,
+        # so they are plain attributes instead of properties. They must always be kept in range.
+        "program_counter",
+        "stack_pointer",
+        # Status register. The bits are packed the way the P register is, except for bits 4
+        # and 5, which don't exist in the CPU and are always clear.
+        "_p",
         ############################################################################################
         # Miscellaneous
         "_memory_bus",
+        # The memory bus methods are cached since they are called for almost every cycle.
+        "_bus_read_byte",
+        "_bus_read_word",
+        "_bus_write_byte",
+        "_bus_read_word_wraparound",
+        # The stack is always in RAM, so it is accessed directly instead of going through
+        # the memory bus.
+        "_ram",
         "_ppu",
-        # The _opcodes array holds a list of callables that are going to be
-        # called for each instruction.
+        # The _opcodes slot holds the shared CPU._DISPATCH tuple of generated
+        # handlers, indexed by opcode and called as handler(cpu).
         "_opcodes",
         # Clock cycles are not calculated at the end of the instruction, but
         # actually during the execution of the CPU instruction themselves,
@@ -68,24 +160,22 @@ class CPU:
             write memory.
         """
         self._memory_bus = memory_bus
+        self._bus_read_byte = memory_bus.read_byte
+        self._bus_read_word = memory_bus.read_word
+        self._bus_write_byte = memory_bus.write_byte
+        self._bus_read_word_wraparound = memory_bus.read_word_wraparound
+        self._ram = memory_bus.ram
         self._ppu = ppu
         self._ppu.cpu = self
 
-        self._carry_flag = False
-        self._zero_flag = False
-        self._interrupt_disabled_flag = True
-        self._decimal_mode_flag = False
-        self._overflow_flag = False
-        self._negative_flag = False
+        self._p = INTERRUPT_DISABLED
 
         self._accumulator = 0
         self._index_x = 0
         self._index_y = 0
 
-        self._stack_pointer = 0xFD
-        self._program_counter = (
-            self._memory_bus.read_byte(0xFFFC) | self._memory_bus.read_byte(0xFFFD) << 8
-        )
+        self.stack_pointer = 0xFD
+        self.program_counter = self._bus_read_byte(0xFFFC) | self._bus_read_byte(0xFFFD) << 8
         self._nb_cycles = 0
 
         self._interrupt_state = InterruptState.NONE
@@ -94,233 +184,12 @@ class CPU:
 
     def _init_opcodes(self):
         """
-        Initializes the opcodes array.
+        Points the CPU to the shared tuple of opcode handlers.
         """
-
-        # Allocate room for all the opcodes.
-        # Prefill the array with unknown opcodes functors. We'll them replace
-        # them with real instructions.
-        self._opcodes = list(lambda: self._unknown_opcode(i) for i in range(256))
-
-        # NOP
-        self._opcodes[0xEA] = self._nop
-
-        # Break
-        self._opcodes[0x00] = self._break
-
-        ############################################################################################
-        # Status register modifiers
-        self._opcodes[0x78] = lambda: self._set_interrupt_disable_flag(True)
-        self._opcodes[0x58] = lambda: self._set_interrupt_disable_flag(False)
-        self._opcodes[0xF8] = lambda: self._set_decimal_mode_flag(True)
-        self._opcodes[0xD8] = lambda: self._set_decimal_mode_flag(False)
-        self._opcodes[0x18] = lambda: self._set_carry_flag(False)
-        self._opcodes[0x38] = lambda: self._set_carry_flag(True)
-        self._opcodes[0xB8] = lambda: self._set_overflow_flag(False)
-
-        ############################################################################################
-        # Stack related operations
-        self._opcodes[0x28] = self._pop_status_register
-        self._opcodes[0x08] = self._push_status_register
-        # Waste a cycle reading and the push the byte.
-        self._opcodes[0x48] = self._push_accumulator
-        self._opcodes[0x68] = self._pop_accumulator
-
-        ############################################################################################
-        # Jump instructions
-        self._opcodes[0x4C] = lambda: self._jump(self._absolute())
-        self._opcodes[0x6C] = lambda: self._jump(self._absolute_jump_address())
-        self._opcodes[0x20] = self._jump_to_subroutine
-        self._opcodes[0x60] = self._jump_from_subroutine
-        self._opcodes[0x40] = self._return_from_interrupt
-
-        ############################################################################################
-        # Store operands
-        # Y -> Memory
-        self._opcodes[0x84] = lambda: self._write_byte(self._zero_page(), self._index_y)
-        self._opcodes[0x94] = lambda: self._write_byte(self._zero_page_x(), self._index_y)
-        self._opcodes[0x8C] = lambda: self._write_byte(self._absolute(), self._index_y)
-
-        # X -> Memory
-        self._opcodes[0x86] = lambda: self._write_byte(self._zero_page(), self._index_x)
-        self._opcodes[0x96] = lambda: self._write_byte(self._zero_page_y(), self._index_x)
-        self._opcodes[0x8E] = lambda: self._write_byte(self._absolute(), self._index_x)
-
-        # Accumulator -> Memory
-        self._opcodes[0x85] = lambda: self._write_byte(self._zero_page(), self._accumulator)
-        self._opcodes[0x95] = lambda: self._write_byte(self._zero_page_x(), self._accumulator)
-        self._opcodes[0x8D] = lambda: self._write_byte(self._absolute(), self._accumulator)
-        self._opcodes[0x9D] = lambda: self._write_byte(self._absolute_x_write(), self._accumulator)
-        self._opcodes[0x99] = lambda: self._write_byte(self._absolute_y_write(), self._accumulator)
-        self._opcodes[0x81] = lambda: self._write_byte(self._indirect_x(), self._accumulator)
-        self._opcodes[0x91] = lambda: self._write_byte(self._indirect_y_write(), self._accumulator)
-
-        ############################################################################################
-        # Loads opcodes
-        # Accumulator <- X|Y|Memory
-        self._opcodes[0x98] = self._tya
-        self._opcodes[0x8A] = self._txa
-        self._opcodes[0xA9] = lambda: self._lda(self._immediate())
-        self._opcodes[0xA5] = lambda: self._lda(self._zero_page())
-        self._opcodes[0xB5] = lambda: self._lda(self._zero_page_x())
-        self._opcodes[0xAD] = lambda: self._lda(self._absolute())
-        self._opcodes[0xBD] = lambda: self._lda(self._absolute_x())
-        self._opcodes[0xB9] = lambda: self._lda(self._absolute_y())
-        self._opcodes[0xA1] = lambda: self._lda(self._indirect_x())
-        self._opcodes[0xB1] = lambda: self._lda(self._indirect_y())
-
-        # Y <- Memory|Accumulator
-        self._opcodes[0xA0] = lambda: self._ldy(self._immediate())
-        self._opcodes[0xA4] = lambda: self._ldy(self._zero_page())
-        self._opcodes[0xB4] = lambda: self._ldy(self._zero_page_x())
-        self._opcodes[0xAC] = lambda: self._ldy(self._absolute())
-        self._opcodes[0xBC] = lambda: self._ldy(self._absolute_x())
-        self._opcodes[0xA8] = self._tay
-
-        # X <- Memory|Accumulator|Stack Pointer
-        self._opcodes[0xA2] = lambda: self._ldx(self._immediate())
-        self._opcodes[0xA6] = lambda: self._ldx(self._zero_page())
-        self._opcodes[0xB6] = lambda: self._ldx(self._zero_page_y())
-        self._opcodes[0xAE] = lambda: self._ldx(self._absolute())
-        self._opcodes[0xBE] = lambda: self._ldx(self._absolute_y())
-        self._opcodes[0xAA] = self._tax
-        self._opcodes[0xBA] = self._tsx
-
-        # SP <- X
-        self._opcodes[0x9A] = self._txs
-
-        ############################################################################################
-        # Branching
-        self._opcodes[0xD0] = lambda: self._branch_if(not self._zero_flag)
-        self._opcodes[0xF0] = lambda: self._branch_if(self._zero_flag)
-        self._opcodes[0x90] = lambda: self._branch_if(not self._carry_flag)
-        self._opcodes[0xB0] = lambda: self._branch_if(self._carry_flag)
-        self._opcodes[0x10] = lambda: self._branch_if(not self._negative_flag)
-        self._opcodes[0x30] = lambda: self._branch_if(self._negative_flag)
-        self._opcodes[0x50] = lambda: self._branch_if(not self._overflow_flag)
-        self._opcodes[0x70] = lambda: self._branch_if(self._overflow_flag)
-
-        ############################################################################################
-        # Bitwise operators
-        # Bit testing
-        self._opcodes[0x24] = lambda: self._bit(self._zero_page())
-        self._opcodes[0x2C] = lambda: self._bit(self._absolute())
-
-        # Shift left
-        self._opcodes[0x0A] = lambda: self._rmw_accumulator(self._asl)
-        self._opcodes[0x06] = lambda: self._rmw_memory(self._zero_page(), self._asl)
-        self._opcodes[0x16] = lambda: self._rmw_memory(self._zero_page_x(), self._asl)
-        self._opcodes[0x0E] = lambda: self._rmw_memory(self._absolute(), self._asl)
-        self._opcodes[0x1E] = lambda: self._rmw_memory(self._absolute_x_write(), self._asl)
-
-        # Shift right
-        self._opcodes[0x4A] = lambda: self._rmw_accumulator(self._logical_shift_right)
-        self._opcodes[0x46] = lambda: self._rmw_memory(self._zero_page(), self._logical_shift_right)
-        self._opcodes[0x56] = lambda: self._rmw_memory(
-            self._zero_page_x(), self._logical_shift_right
-        )
-        self._opcodes[0x4E] = lambda: self._rmw_memory(self._absolute(), self._logical_shift_right)
-        self._opcodes[0x5E] = lambda: self._rmw_memory(
-            self._absolute_x_write(), self._logical_shift_right
-        )
-
-        # Rotate left
-        self._opcodes[0x2A] = lambda: self._rmw_accumulator(self._rotate_left)
-        self._opcodes[0x26] = lambda: self._rmw_memory(self._zero_page(), self._rotate_left)
-        self._opcodes[0x36] = lambda: self._rmw_memory(self._zero_page_x(), self._rotate_left)
-        self._opcodes[0x2E] = lambda: self._rmw_memory(self._absolute(), self._rotate_left)
-        self._opcodes[0x3E] = lambda: self._rmw_memory(self._absolute_x_write(), self._rotate_left)
-
-        # Rotate Right
-        self._opcodes[0x6A] = lambda: self._rmw_accumulator(self._rotate_right)
-        self._opcodes[0x66] = lambda: self._rmw_memory(self._zero_page(), self._rotate_right)
-        self._opcodes[0x76] = lambda: self._rmw_memory(self._zero_page_x(), self._rotate_right)
-        self._opcodes[0x6E] = lambda: self._rmw_memory(self._absolute(), self._rotate_right)
-        self._opcodes[0x7E] = lambda: self._rmw_memory(self._absolute_x_write(), self._rotate_right)
-
-        # OR
-        self._opcodes[0x09] = lambda: self._ora(self._immediate())
-        self._opcodes[0x05] = lambda: self._ora(self._zero_page())
-        self._opcodes[0x15] = lambda: self._ora(self._zero_page_x())
-        self._opcodes[0x0D] = lambda: self._ora(self._absolute())
-        self._opcodes[0x1D] = lambda: self._ora(self._absolute_x())
-        self._opcodes[0x19] = lambda: self._ora(self._absolute_y())
-        self._opcodes[0x01] = lambda: self._ora(self._indirect_x())
-        self._opcodes[0x11] = lambda: self._ora(self._indirect_y())
-
-        # Exclusive OR
-        self._opcodes[0x49] = lambda: self._eor(self._immediate())
-        self._opcodes[0x45] = lambda: self._eor(self._zero_page())
-        self._opcodes[0x55] = lambda: self._eor(self._zero_page_x())
-        self._opcodes[0x4D] = lambda: self._eor(self._absolute())
-        self._opcodes[0x5D] = lambda: self._eor(self._absolute_x())
-        self._opcodes[0x59] = lambda: self._eor(self._absolute_y())
-        self._opcodes[0x41] = lambda: self._eor(self._indirect_x())
-        self._opcodes[0x51] = lambda: self._eor(self._indirect_y())
-
-        # AND
-        self._opcodes[0x29] = lambda: self._and(self._immediate())
-        self._opcodes[0x25] = lambda: self._and(self._zero_page())
-        self._opcodes[0x35] = lambda: self._and(self._zero_page_x())
-        self._opcodes[0x2D] = lambda: self._and(self._absolute())
-        self._opcodes[0x3D] = lambda: self._and(self._absolute_x())
-        self._opcodes[0x39] = lambda: self._and(self._absolute_y())
-        self._opcodes[0x21] = lambda: self._and(self._indirect_x())
-        self._opcodes[0x31] = lambda: self._and(self._indirect_y())
-
-        ############################################################################################
-        # Arithmetic
-        # Increment
-        self._opcodes[0xE6] = lambda: self._rmw_memory(self._zero_page(), self._increment)
-        self._opcodes[0xF6] = lambda: self._rmw_memory(self._zero_page_x(), self._increment)
-        self._opcodes[0xEE] = lambda: self._rmw_memory(self._absolute(), self._increment)
-        self._opcodes[0xFE] = lambda: self._rmw_memory(self._absolute_x_write(), self._increment)
-        self._opcodes[0xE8] = lambda: self._rmw_index_x(self._increment)
-        self._opcodes[0xC8] = lambda: self._rmw_index_y(self._increment)
-
-        # Decrement
-        self._opcodes[0xCA] = lambda: self._rmw_index_x(self._decrement)
-        self._opcodes[0x88] = lambda: self._rmw_index_y(self._decrement)
-        self._opcodes[0xC6] = lambda: self._rmw_memory(self._zero_page(), self._decrement)
-        self._opcodes[0xD6] = lambda: self._rmw_memory(self._zero_page_x(), self._decrement)
-        self._opcodes[0xCE] = lambda: self._rmw_memory(self._absolute(), self._decrement)
-        self._opcodes[0xDE] = lambda: self._rmw_memory(self._absolute_x_write(), self._decrement)
-
-        # Compare
-        self._opcodes[0xE0] = lambda: self._cmp(self._index_x, self._immediate())
-        self._opcodes[0xE4] = lambda: self._cmp(self._index_x, self._zero_page())
-        self._opcodes[0xEC] = lambda: self._cmp(self._index_x, self._absolute())
-        self._opcodes[0xC0] = lambda: self._cmp(self._index_y, self._immediate())
-        self._opcodes[0xC4] = lambda: self._cmp(self._index_y, self._zero_page())
-        self._opcodes[0xCC] = lambda: self._cmp(self._index_y, self._absolute())
-        self._opcodes[0xC9] = lambda: self._cmp(self._accumulator, self._immediate())
-        self._opcodes[0xC5] = lambda: self._cmp(self._accumulator, self._zero_page())
-        self._opcodes[0xD5] = lambda: self._cmp(self._accumulator, self._zero_page_x())
-        self._opcodes[0xCD] = lambda: self._cmp(self._accumulator, self._absolute())
-        self._opcodes[0xDD] = lambda: self._cmp(self._accumulator, self._absolute_x())
-        self._opcodes[0xD9] = lambda: self._cmp(self._accumulator, self._absolute_y())
-        self._opcodes[0xC1] = lambda: self._cmp(self._accumulator, self._indirect_x())
-        self._opcodes[0xD1] = lambda: self._cmp(self._accumulator, self._indirect_y())
-
-        # Add
-        self._opcodes[0x69] = lambda: self._adc(self._immediate())
-        self._opcodes[0x65] = lambda: self._adc(self._zero_page())
-        self._opcodes[0x75] = lambda: self._adc(self._zero_page_x())
-        self._opcodes[0x6D] = lambda: self._adc(self._absolute())
-        self._opcodes[0x7D] = lambda: self._adc(self._absolute_x())
-        self._opcodes[0x79] = lambda: self._adc(self._absolute_y())
-        self._opcodes[0x61] = lambda: self._adc(self._indirect_x())
-        self._opcodes[0x71] = lambda: self._adc(self._indirect_y())
-
-        # Substract
-        self._opcodes[0xE9] = lambda: self._sbc(self._immediate())
-        self._opcodes[0xE5] = lambda: self._sbc(self._zero_page())
-        self._opcodes[0xF5] = lambda: self._sbc(self._zero_page_x())
-        self._opcodes[0xED] = lambda: self._sbc(self._absolute())
-        self._opcodes[0xFD] = lambda: self._sbc(self._absolute_x())
-        self._opcodes[0xF9] = lambda: self._sbc(self._absolute_y())
-        self._opcodes[0xE1] = lambda: self._sbc(self._indirect_x())
-        self._opcodes[0xF1] = lambda: self._sbc(self._indirect_y())
+        # The handlers are shared by all CPUs, so they are only built once when the
+        # module is loaded. They are plain functions that take the CPU as their
+        # argument. Calling them that way is cheaper than going through bound methods.
+        self._opcodes = self._DISPATCH
 
     def __getstate__(self):
         """
@@ -328,8 +197,8 @@ class CPU:
 
         :returns: `dict` of the state.
         """
-        # The opcodes list can't be pickled because _opcodes are lambdas which are not
-        # pickle-able it seems.
+        # The opcodes tuple can't be pickled because the handlers are generated with exec, so
+        # pickle can't look them up by name. It is shared by all CPUs anyway.
         return {slot: getattr(self, slot) for slot in self.__slots__ if slot != "_opcodes"}
 
     def __setstate__(self, state):
@@ -355,10 +224,16 @@ class CPU:
         """
         nb_cycles_before = self._nb_cycles
         if self._interrupt_state == InterruptState.NONE:
-            self._opcodes[self._read_code_byte()]()
+            # The opcode fetch is inlined so the only call made for an instruction is the
+            # one to its handler, which keeps the traces short on PyPy.
+            pc = self.program_counter
+            opcode = self._bus_read_byte(pc)
+            self.program_counter = (pc + 1) & 0xFFFF
+            self._nb_cycles = nb_cycles_before + 1
+            self._opcodes[opcode](self)
         elif self._interrupt_state == InterruptState.VBLANK:
             # CPU wastes a cycle reading the next instruction
-            self._read_byte(self._program_counter)
+            self._read_byte(self.program_counter)
             self._handle_interrupt(0xFFFA)
             self._interrupt_state = InterruptState.NONE
         return self._nb_cycles - nb_cycles_before
@@ -403,12 +278,12 @@ class CPU:
                                    jump to.
         """
         # Push the state of the program counter and status register
-        self._push_word(self._program_counter)
+        self._push_word(self.program_counter)
         self._push_byte(self.status | 0b00010000)
 
         # Update the program counter.
-        self._program_counter = self._read_word(interrupt_addr)
-        self._interrupt_disabled_flag = True
+        self.program_counter = self._read_word(interrupt_addr)
+        self._p |= INTERRUPT_DISABLED
 
     def _tick(self):
         """
@@ -433,20 +308,6 @@ class CPU:
         """
         self._nb_cycles = nb_cycles
 
-    @property
-    def program_counter(self):
-        """
-        Access the program counter.
-        """
-        return self._program_counter
-
-    @program_counter.setter
-    def program_counter(self, program_counter):
-        """
-        Access the program counter.
-        """
-        self._program_counter = program_counter & 0xFFFF
-
     @property
     def accumulator(self):
         """
@@ -468,35 +329,13 @@ class CPU:
         """
         return self._index_y
 
-    @property
-    def stack_pointer(self):
-        """
-        Access the stack pointer.
-        """
-        return self._stack_pointer
-
-    @stack_pointer.setter
-    def stack_pointer(self, stack_pointer):
-        """
-        Access the stack pointer.
-        """
-        self._stack_pointer = stack_pointer & 0xFF
-
     @property
     def status(self):
         """
         Access the status flag.
         """
-        # The status flag is always read with bit 6 set
-        return (
-            int(self._carry_flag)
-            | (int(self._zero_flag) << 1)
-            | (int(self._interrupt_disabled_flag) << 2)
-            | (int(self._decimal_mode_flag) << 3)
-            | (1 << 5)
-            | (int(self._overflow_flag) << 6)
-            | (int(self._negative_flag) << 7)
-        )
+        # The status flag is always read with bit 5 set
+        return self._p | 0x20
 
     def reset(self):
         """
@@ -505,9 +344,9 @@ class CPU:
         # Do not call the _handle_interrupt routine here. The CPU doesn't actually
         # write to the RAM the values upon reset.
         # https://wiki.nesdev.com/w/index.php/CPU_power_up_state
-        self._stack_pointer = (self._stack_pointer - 3) & 0xFF
-        self._interrupt_disabled_flag = True
-        self._program_counter = self._read_word(0xFFFC)
+        self.stack_pointer = (self.stack_pointer - 3) & 0xFF
+        self._p |= INTERRUPT_DISABLED
+        self.program_counter = self._read_word(0xFFFC)
 
     def _read_code_byte(self):
         """
@@ -516,8 +355,8 @@ class CPU:
         :returns: The byte that was read.
         :rtype: int
         """
-        byte = self._read_byte(self._program_counter)
-        self._program_counter += 1
+        byte = self._read_byte(self.program_counter)
+        self.program_counter = (self.program_counter + 1) & 0xFFFF
         return byte
 
     def _read_code_word(self):
@@ -530,7 +369,11 @@ class CPU:
         :returns: The word that was read.
         :rtype: int
         """
-        return self._read_code_byte() | (self._read_code_byte() << 8)
+        pc = self.program_counter
+        word = self._bus_read_word(pc)
+        self.program_counter = (pc + 2) & 0xFFFF
+        self._nb_cycles += 2
+        return word
 
     def _read_byte(self, addr):
         """
@@ -540,7 +383,7 @@ class CPU:
 
         :returns: The read byte.
         """
-        value = self._memory_bus.read_byte(addr)
+        value = self._bus_read_byte(addr)
         self._tick()
         return value
 
@@ -551,7 +394,7 @@ class CPU:
         :param int addr: Address to write to.
         :param int value: Value to write.
         """
-        self._memory_bus.write_byte(addr, value)
+        self._bus_write_byte(addr, value)
         self._tick()
 
     def _read_word(self, addr):
@@ -562,50 +405,13 @@ class CPU:
 
         :returns: The read word.
         """
-        return self._read_byte(addr) | (self._read_byte(addr + 1) << 8)
+        word = self._bus_read_word(addr)
+        self._nb_cycles += 2
+        return word
 
     ############################################################################
-    # The following methods compute the address referred by the operand.
-
-    # _zero_page would simply pass-through to _read_core_byte, so alias the
-    # method name so we save one function call, which are expensive.
-    _zero_page = _read_code_byte
-
-    def _immediate(self):
-        """
-        Compute the immediate address, i.e. address of the program counter
-
-        :returns: Program Counter value.
-        """
-        pc = self._program_counter
-        self._program_counter += 1
-        return pc
-
-    def _zero_page_x(self):
-        """
-        Compute a memory address by adding the value of the next byte + X.
-
-        :returns: Address between 0 and 255.
-        """
-        base = self._zero_page()
-        # waste a read cycle at the wrong locatiom
-        self._tick()
-        return (base + self._index_x) & 0xFF
-
-    def _zero_page_y(self):
-        """
-        Compute a memory address by adding the value of the next byte + Y.
-
-        :returns: Address between 0 and 255.
-        """
-        base = self._zero_page()
-        # wastes a cycle reading at base
-        self._tick()
-        return (base + self._index_y) & 0xFF
-
-    # _absolute would simply pass-through to _read_code_word, so alias the
-    # method name so we save one function call, which are expensive.
-    _absolute = _read_code_word
+    # Most addressing modes are inlined in the generated opcode handlers. Only
+    # the indirect jump needs to compute its address here.
 
     def _absolute_jump_address(self):
         """
@@ -615,123 +421,13 @@ class CPU:
         :returns: Address between 0 and 65535.
         """
         addr = self._read_code_word()
-        first_addr = addr
         # There's a bug in the 6502 when fetching the
         # address on a page boundary. It reads
         # the second byte at the beginning of the current page
         # instead of the next one.
-        if addr & 0xFF == 0xFF:
-            second_addr = addr & 0xFF00
-        else:
-            second_addr = addr + 1
-        return self._read_byte(first_addr) | (self._read_byte(second_addr) << 8)
-
-    def _absolute_x(self):
-        """
-        Compute memory address taken from the next word + index x.
-
-        :returns: Address between 0 and 65535.
-        """
-        src = self._absolute()
-        dst = (src + self._index_x) & 0xFFFF
-        if self._is_new_page(src, dst):
-            self._tick()
-        return dst
-
-    def _absolute_x_write(self):
-        """
-        Compute memory address taken from the next word + index x during a write.
-
-        :returns: Address between 0 and 65535.
-        """
-        src = self._absolute()
-        dst = (src + self._index_x) & 0xFFFF
-        # During a write, we always tick, whether this is a new page or not.
-        self._tick()
-        return dst
-
-    def _absolute_y(self):
-        """
-        Compute memory address taken from the next word + index y.
-
-        :returns: Address between 0 and 65535.
-        """
-        src = self._absolute()
-        dst = (src + self._index_y) & 0xFFFF
-        if self._is_new_page(src, dst):
-            self._tick()
-        return dst
-
-    def _absolute_y_write(self):
-        """
-        Compute memory address taken from the next word + index y during a write.
-
-        :returns: Address between 0 and 65535.
-        """
-        src = self._absolute()
-        dst = (src + self._index_y) & 0xFFFF
-        # During a write, we always tick, whether this is a new page or not.
-        self._tick()
-        return dst
-
-    def _indirect(self):
-        """
-        Compute memory address taken at the address referred by the next word.
-
-        :returns: Address between 0 and 65535.
-        """
-        return self._read_word(self._absolute())
-
-    def _indirect_x(self):
-        """
-        Retrieve address in memory found at the zero page x address.
-
-        :returns: Address between 0 and 65535.
-        """
-        addr = self._zero_page_x()
-        return self._read_byte(addr) | (self._read_byte((addr + 1) & 0xFF) << 8)
-
-    def _indirect_y(self):
-        """
-        Retrieve address in memory found at the zero page address and
-        adds the y offset.
-
-        :returns: Address between 0 and 65535.
-        """
-        addr = self._zero_page()
-        src = self._read_byte(addr) | (self._read_byte((addr + 1) & 0xFF) << 8)
-        dst = (src + self._index_y) & 0xFFFF
-        if self._is_new_page(src, dst):
-            self._tick()
-
-        return dst
-
-    def _indirect_y_write(self):
-        """
-        Retrieve address in memory found at the zero page address and
-        adds the y offset during a write.
-
-        :returns: Address between 0 and 65535.
-        """
-        addr = self._zero_page()
-        src = self._read_byte(addr) | (self._read_byte((addr + 1) & 0xFF) << 8)
-        dst = (src + self._index_y) & 0xFFFF
-
-        # During a write, we always tick, whether this is a new page or not.
-        self._tick()
-        return dst
-
-    def _relative(self):
-        """
-        Retrieve a signed address offset from the next byte.
-
-        :returns: Offset between -128 and 127.
-        """
-        value = self._read_code_byte()
-        if value <= 127:
-            return value
-        else:
-            return -256 + value
+        target = self._bus_read_word_wraparound(addr, 0xFF)
+        self._nb_cycles += 2
+        return target
 
     ############################################################################
     # The following methods operate on the stack.
@@ -742,8 +438,9 @@ class CPU:
 
         :param int value: Value to push on the stack.
         """
-        self._write_byte((self._stack_pointer + 0x100), value)
-        self._stack_pointer = (self._stack_pointer - 1) & 0xFF
+        self._ram[0x100 | self.stack_pointer] = value
+        self._nb_cycles += 1
+        self.stack_pointer = _DEC8[self.stack_pointer]
 
     def _push_word(self, value):
         """
@@ -751,14 +448,18 @@ class CPU:
 
         :param int value: Value to push on the stack.
         """
-        self._push_byte(value >> 8)
-        self._push_byte(value & 0xFF)
+        ram = self._ram
+        stack_pointer = self.stack_pointer
+        ram[0x100 | stack_pointer] = value >> 8
+        ram[0x100 | _DEC8[stack_pointer]] = value & 0xFF
+        self.stack_pointer = (stack_pointer - 2) & 0xFF
+        self._nb_cycles += 2
 
     def _increment_stack_pointer(self):
         """
         Increments the stack pointer by 1.
         """
-        self._stack_pointer = (self._stack_pointer + 1) & 0xFF
+        self.stack_pointer = _INC8[self.stack_pointer]
 
     def _read_stack_top(self):
         """
@@ -766,11 +467,13 @@ class CPU:
 
         :returns: The top byte.
         """
-        return self._read_byte(self._stack_pointer + 0x100)
+        self._nb_cycles += 1
+        return self._ram[0x100 | self.stack_pointer]
 
     ############################################################################
     # The following emulates the CPU opcodes
 
+    @_opcode(0x00)
     def _break(self):
         """
         Save the current program counter and status register and jump to the
@@ -781,142 +484,108 @@ class CPU:
         self._read_code_byte()
         self._handle_interrupt(0xFFFE)
 
-    def _nop(self):
-        """
-        Nop. It ticks!
-        """
-        self._tick()
-
-    def _set_interrupt_disable_flag(self, value):
-        """
-        Set the interrupt disable flag.
-
-        :param bool value: Value to set the flag.
-        """
-        self._interrupt_disabled_flag = value
-        self._tick()
-
-    def _set_carry_flag(self, value):
-        """
-        Set the carry flag.
-
-        :param bool value: Value to set the flag.
-        """
-        self._carry_flag = value
-        self._tick()
-
-    def _set_overflow_flag(self, value):
-        """
-        Set the overflow flag.
-
-        :param bool value: Value to set the flag.
-        """
-        self._overflow_flag = value
-        self._tick()
-
-    def _set_decimal_mode_flag(self, value):
-        """
-        Set the decimal mode flag.
-
-        :param bool value: Value to set the flag.
-        """
-        self._decimal_mode_flag = value
-        self._tick()
-
+    @_opcode(0x28)
     def _pop_status_register(self):
         """
         Pop the status register from the stack.
         """
-        self._tick()
-
-        self._increment_stack_pointer()
-        self._tick()
-
-        self._update_status_register(self._read_stack_top())
+        stack_pointer = _INC8[self.stack_pointer]
+        self.stack_pointer = stack_pointer
+        # Bits 4 and 5 are ignored.
+        self._p = self._ram[0x100 | stack_pointer] & 0xCF
+        # Waste a cycle, increment the stack pointer and read the top.
+        self._nb_cycles += 3
 
     def _update_status_register(self, value):
         """
         Update the status flags with the given value.
 
-        It decomposes the byte into a set of booleans.
+        Bits 4 and 5 are ignored.
 
         :param int value: Value of the flag register.
         """
-        self._carry_flag = bool(value & 0x1)
-        self._zero_flag = bool(value & 0x2)
-        self._interrupt_disabled_flag = bool(value & 0x4)
-        self._decimal_mode_flag = bool(value & 0x8)
-        self._overflow_flag = bool(value & 0x40)
-        self._negative_flag = bool(value & 0x80)
+        self._p = value & 0xCF
 
+    @_opcode(0x08)
     def _push_status_register(self):
         """
         Push the status register on the stack.
         """
         # The two unused bits are always pushed as set.
-        self._tick()
-        self._push_byte(self.status | 0b00010000)
+        stack_pointer = self.stack_pointer
+        self._ram[0x100 | stack_pointer] = self._p | 0b00110000
+        self.stack_pointer = _DEC8[stack_pointer]
+        # Waste a cycle and write to the stack.
+        self._nb_cycles += 2
 
+    @_opcode(0x48)
     def _push_accumulator(self):
         """
         Push the accumulator on the stack.
         """
-        # Waste a cycle reading a byte.
-        self._tick()
-        self._push_byte(self._accumulator)
+        stack_pointer = self.stack_pointer
+        self._ram[0x100 | stack_pointer] = self._accumulator
+        self.stack_pointer = _DEC8[stack_pointer]
+        # Waste a cycle reading a byte and write to the stack.
+        self._nb_cycles += 2
 
+    @_opcode(0x68)
     def _pop_accumulator(self):
         """
         Pops the accumulator from the stack.
         """
-        # Waste a cycle reading a byte.
-        self._tick()
-
-        self._increment_stack_pointer()
-        self._tick()
-
-        self._load_accumulator(self._read_stack_top())
+        stack_pointer = _INC8[self.stack_pointer]
+        self.stack_pointer = stack_pointer
+        value = self._ram[0x100 | stack_pointer]
+        self._accumulator = value
+        self._p = (self._p & 0x7D) | _NZ[value]
+        # Waste a cycle reading a byte, increment the stack pointer and read the top.
+        self._nb_cycles += 3
 
-    def _jump(self, addr):
+    @_opcode(0x6C)
+    def _jump_indirect(self):
         """
-        Update the program counter to the passed in address.
-
-        :param int addr: Address to jump to.
+        Jump to the address stored at the memory location referred by the next word.
         """
-        self._program_counter = addr
+        self.program_counter = self._absolute_jump_address()
 
+    @_opcode(0x20)
     def _jump_to_subroutine(self):
         """
         Jump to the memory location referred by the next word.
 
         Pushes the return address on stack first.
         """
-        pcl = self._read_code_byte()
-        # Waste a cycle
-        self._tick()
-        self._push_word(self._program_counter)
-        pch = self._read_code_byte()
-        self._program_counter = pcl | (pch << 8)
-
+        # This is called for every subroutine, so the reads and the push are inlined.
+        pc = self.program_counter
+        target = self._bus_read_word(pc)
+        # The return address is the address of the last byte of the instruction.
+        return_address = (pc + 1) & 0xFFFF
+        ram = self._ram
+        stack_pointer = self.stack_pointer
+        ram[0x100 | stack_pointer] = return_address >> 8
+        ram[0x100 | _DEC8[stack_pointer]] = return_address & 0xFF
+        self.stack_pointer = (stack_pointer - 2) & 0xFF
+        self.program_counter = target
+        # Two reads, two writes and a wasted cycle.
+        self._nb_cycles += 5
+
+    @_opcode(0x60)
     def _jump_from_subroutine(self):
         """
         Jump to the memory location at the top of the stack.
         """
-        # waste a read
-        self._tick()
-
-        self._increment_stack_pointer()
-        self._tick()
-
-        pcl = self._read_stack_top()
-        self._increment_stack_pointer()
-
-        pch = self._read_stack_top()
-
-        self._program_counter = pcl | (pch << 8)
-        self._program_counter += 1
-        self._tick()
-
+        ram = self._ram
+        stack_pointer = self.stack_pointer
+        pcl = ram[0x100 | _INC8[stack_pointer]]
+        pch = ram[0x100 | ((stack_pointer + 2) & 0xFF)]
+        self.stack_pointer = (stack_pointer + 2) & 0xFF
+        self.program_counter = ((pcl | (pch << 8)) + 1) & 0xFFFF
+        # Two reads, incrementing the stack pointer and the program counter, and a wasted
+        # read.
+        self._nb_cycles += 5
+
+    @_opcode(0x40)
     def _return_from_interrupt(self):
         """
         Pop the status register and program counter from the stack.
@@ -935,393 +604,707 @@ class CPU:
 
         pch = self._read_stack_top()
 
-        self._program_counter = pcl | (pch << 8)
+        self.program_counter = pcl | (pch << 8)
 
-    def _load_index_x(self, value):
+    def _unknown_opcode(self):
         """
-        Load value into register x.
+        Raises an NotImplementedError with the opcode number.
 
-        :param value: Value to load into x.
+        This handler is shared by all unsupported opcodes, so the opcode is read back
+        from the address it was fetched from.
         """
-        self._index_x = value
-        self._zero_flag = not value
-        self._negative_flag = bool(value & 0x80)
+        addr = (self.program_counter - 1) & 0xFFFF
+        opcode = self._bus_read_byte(addr)
+        raise NotImplementedError(f"Unknown opcode {hex(opcode)} at {hex(addr)}")
 
-    def _ldx(self, addr):
-        """
-        Load value at a given address into x.
 
-        :param int addr: Address to load value into.
-        """
-        value = self._read_byte(addr)
-        self._index_x = value
-        self._zero_flag = not value
-        self._negative_flag = bool(value & 0x80)
+################################################################################################
+# Most instructions are a combination of an addressing mode and an operation. Going through
+# one method for the addressing mode and another one for the operation costs several function
+# calls per instruction, which are expensive. Instead, the source code of a handler is
+# generated for each (opcode, addressing mode) pair, with both parts inlined.
+#
+# The handlers update the cycle count in bulk instead of ticking on every memory access. The
+# cycles elapsed so far must still be counted before each write, since writing to 0x4014
+# starts a DMA transfer, whose duration depends on the cycle count.
+#
+# IDEA: Instructions in ROM never change, so they could be decoded once into a (handler,
+# operand) pair cached per address, sparing the operand reads on every execution. The cache
+# would need to be flushed every time a mapper switches banks, which MMC1 games do all the
+# time, and the handlers would need a second variant taking the operand. Reads from ROM are
+# already cheap on PyPy, so this is left out until profiling shows the operand fetches matter.
 
-    def _tax(self):
-        """
-        Transfer accumulator into x.
-        """
-        self._load_index_x(self._accumulator)
-        self._tick()
 
-    def _tsx(self):
-        """
-        Transfer x into stack pointer.
-        """
-        self._load_index_x(self._stack_pointer)
-        self._tick()
+def _code(*lines):
+    """
+    Join lines of code, skipping empty ones.
 
-    def _load_index_y(self, value):
-        """
-        Load value into register y.
+    :param str lines: Lines of code.
 
-        :param int value: Value to load.
-        """
-        self._index_y = value
-        self._zero_flag = not value
-        self._negative_flag = bool(value & 0x80)
+    :returns: The lines separated by new lines.
+    """
+    return "\n".join(line for line in lines if line)
 
-    def _ldy(self, addr):
-        """
-        Load value into register y.
 
-        :param int value: Value to load.
-        """
-        value = self._read_byte(addr)
-        self._index_y = value
-        self._zero_flag = not value
-        self._negative_flag = bool(value & 0x80)
+def _update_flags(mask, bits):
+    """
+    Generate the code updating some of the status flags.
 
-    def _tay(self):
-        """
-        Transfer accumulator into y.
-        """
-        self._load_index_y(self._accumulator)
-        self._tick()
+    :param int mask: Flags to update.
+    :param str bits: Expression of the new value of the flags.
 
-    def _tya(self):
-        """
-        Transfer y into accumulator.
-        """
-        self._load_accumulator(self._index_y)
-        self._tick()
+    :returns: The code updating the flags.
+    """
+    return f"self._p = (self._p & {0xFF ^ mask:#04x}) | {bits}"
 
-    def _txa(self):
-        """
-        Transfer x into accumulator.
-        """
-        self._load_accumulator(self._index_x)
-        self._tick()
 
-    def _load_accumulator(self, value):
-        """
-        Load value into accumulator
+def _update_nz(value):
+    """
+    Generate the code updating the zero and negative flags.
 
-        :param int value: Value to load.
-        """
-        self._accumulator = value
-        self._zero_flag = not value
-        self._negative_flag = bool(value & 0x80)
+    :param str value: Expression of the value to test.
 
-    def _lda(self, addr):
-        """
-        Loads a byte from memory into accumulator.
+    :returns: The code updating the flags.
+    """
+    return _update_flags(ZERO | NEGATIVE, f"_NZ[{value}]")
 
-        :param int addr: Address to read the byte from.
-        """
-        value = self._read_byte(addr)
-        self._accumulator = value
-        self._zero_flag = not value
-        self._negative_flag = bool(value & 0x80)
 
-    def _txs(self):
-        """
-        Load X into stack pointer.
-        """
-        self._stack_pointer = self._index_x
-        self._tick()
+def _set_flag(mask):
+    """
+    Generate the code setting a status flag.
 
-    def _branch_if(self, should_branch):
-        """
-        Offset the program counter by to the relative address read from memory
-        if the passed in flag is ``True``.
+    :param int mask: Flag to set.
 
-        :param bool should_branch: Flag value to test.
-        """
-        # Read the operand first before testing to make sure
-        # the program counter is updated.
-        offset = self._relative()
-        if should_branch:
-            self._tick()
-            destination = self._program_counter + offset
-            if self._is_new_page(self._program_counter, destination):
-                self._tick()
-            self._program_counter = destination
+    :returns: The code setting the flag.
+    """
+    return f"self._p |= {mask:#04x}"
 
-    def _is_new_page(self, src, dest):
-        """
-        Compare addresses to see if the destination is a new page.
 
-        :param int src: Source address
-        :param int dest: Destination address
+def _clear_flag(mask):
+    """
+    Generate the code clearing a status flag.
 
-        :returns: ``True`` if the src and dest are on different pages, ``False``
-            otherwise.
-        """
-        return (src & 0xFF00) != (dest & 0xFF00)
+    :param int mask: Flag to clear.
 
-    def _bit(self, addr):
-        """
-        Test the overflow and negative bit and zero value of the passed in value.
+    :returns: The code clearing the flag.
+    """
+    return f"self._p &= {0xFF ^ mask:#04x}"
 
-        :param int value: Value to test.
-        """
-        value = self._read_byte(addr)
-        self._overflow_flag = bool(value & 0b01000000)
-        self._negative_flag = bool(value & 0b10000000)
-        self._zero_flag = not (self._accumulator & value)
 
-    def _asl(self, value):
-        """
-        Shift bits from the passed in value left.
-
-        This is usually used during a read-modify-write instruction.
+def _is_set(mask):
+    """
+    Generate the condition testing if a status flag is set.
 
-        :param int value: Value to shift
+    :param int mask: Flag to test.
 
-        :returns: The shifted value.
-        """
-        self._carry_flag = bool(value & 0x80)
-        result = (value << 1) & 0xFF
-        self._zero_flag = not result
-        self._negative_flag = bool(result & 0x80)
-        return result
+    :returns: The condition.
+    """
+    return f"self._p & {mask:#04x}"
 
-    def _logical_shift_right(self, value):
-        """
-        Shift bits from value right.
 
-        This is usually used during a read-modify-write instruction.
+def _is_clear(mask):
+    """
+    Generate the condition testing if a status flag is clear.
 
-        :param int value: Value to shift.
+    :param int mask: Flag to test.
 
-        :returns: Shifted value.
-        """
-        self._carry_flag = bool(value & 0x1)
-        result = value >> 1
-        self._zero_flag = not result
-        self._negative_flag = bool(result & 0x80)
-        return result
+    :returns: The condition.
+    """
+    return f"not self._p & {mask:#04x}"
+
+
+# Code computing the address an instruction operates on, stored in ``addr``, along with the
+# number of cycles spent doing so. The page crossing penalty is counted by the code itself.
+_PAGE_CROSSING = _code("if (base ^ addr) & 0xFF00:", "    self._nb_cycles += 1")
+_ADDRESS_MODES = {
+    "immediate": (
+        _code("addr = self.program_counter", "self.program_counter = (addr + 1) & 0xFFFF"),
+        0,
+    ),
+    "zero_page": (
+        _code(
+            "pc = self.program_counter",
+            "addr = read_byte(pc)",
+            "self.program_counter = (pc + 1) & 0xFFFF",
+        ),
+        1,
+    ),
+    # Wastes a cycle reading at the base address.
+    "zero_page_x": (
+        _code(
+            "pc = self.program_counter",
+            "addr = (read_byte(pc) + self._index_x) & 0xFF",
+            "self.program_counter = (pc + 1) & 0xFFFF",
+        ),
+        2,
+    ),
+    "zero_page_y": (
+        _code(
+            "pc = self.program_counter",
+            "addr = (read_byte(pc) + self._index_y) & 0xFF",
+            "self.program_counter = (pc + 1) & 0xFFFF",
+        ),
+        2,
+    ),
+    "absolute": (
+        _code(
+            "pc = self.program_counter",
+            "addr = read_word(pc)",
+            "self.program_counter = (pc + 2) & 0xFFFF",
+        ),
+        2,
+    ),
+    "absolute_x": (
+        _code(
+            "pc = self.program_counter",
+            "base = read_word(pc)",
+            "addr = (base + self._index_x) & 0xFFFF",
+            "self.program_counter = (pc + 2) & 0xFFFF",
+            _PAGE_CROSSING,
+        ),
+        2,
+    ),
+    # During a write, we always tick, whether this is a new page or not.
+    "absolute_x_write": (
+        _code(
+            "pc = self.program_counter",
+            "base = read_word(pc)",
+            "addr = (base + self._index_x) & 0xFFFF",
+            "self.program_counter = (pc + 2) & 0xFFFF",
+        ),
+        3,
+    ),
+    "absolute_y": (
+        _code(
+            "pc = self.program_counter",
+            "base = read_word(pc)",
+            "addr = (base + self._index_y) & 0xFFFF",
+            "self.program_counter = (pc + 2) & 0xFFFF",
+            _PAGE_CROSSING,
+        ),
+        2,
+    ),
+    "absolute_y_write": (
+        _code(
+            "pc = self.program_counter",
+            "base = read_word(pc)",
+            "addr = (base + self._index_y) & 0xFFFF",
+            "self.program_counter = (pc + 2) & 0xFFFF",
+        ),
+        3,
+    ),
+    "indirect_x": (
+        _code(
+            "pc = self.program_counter",
+            "pointer = (read_byte(pc) + self._index_x) & 0xFF",
+            "addr = read_word_wraparound(pointer, 0xFF)",
+            "self.program_counter = (pc + 1) & 0xFFFF",
+        ),
+        4,
+    ),
+    "indirect_y": (
+        _code(
+            "pc = self.program_counter",
+            "pointer = read_byte(pc)",
+            "base = read_word_wraparound(pointer, 0xFF)",
+            "addr = (base + self._index_y) & 0xFFFF",
+            "self.program_counter = (pc + 1) & 0xFFFF",
+            _PAGE_CROSSING,
+        ),
+        3,
+    ),
+    "indirect_y_write": (
+        _code(
+            "pc = self.program_counter",
+            "pointer = read_byte(pc)",
+            "base = read_word_wraparound(pointer, 0xFF)",
+            "addr = (base + self._index_y) & 0xFFFF",
+            "self.program_counter = (pc + 1) & 0xFFFF",
+        ),
+        4,
+    ),
+}
+
+
+def _load(register):
+    """
+    Generate the code of a load operation.
 
-    def _rotate_left(self, value):
-        """
-        Rotate bits from the passed in value left.
+    :param str register: Register the value is loaded into.
 
-        This is usually used during a read-modify-write instruction.
+    :returns: Code loading ``value`` into the register.
+    """
+    return _code(f"{register} = value", _update_nz("value"))
 
-        :param int value: Value to rotate
 
-        :returns: The rotated value.
-        """
-        result = ((value << 1) & 0xFF) | int(self._carry_flag)
-        self._carry_flag = bool(value & 0x80)
-        self._zero_flag = not result
-        self._negative_flag = bool(result & 0x80)
-        return result
+def _transfer(source, destination):
+    """
+    Generate the code of a transfer operation.
 
-    def _rotate_right(self, value):
-        """
-        Rotate bits from the passed in value right.
+    :param str source: Register to read from.
+    :param str destination: Register to load the value into.
 
-        This is usually used during a read-modify-write instruction.
+    :returns: Code copying the source register into the destination.
+    """
+    return _code(f"value = {source}", _load(destination))
 
-        :param int value: Value to rotate
 
-        :returns: The rotated value.
-        """
-        result = (value >> 1) | (int(self._carry_flag) << 7)
-        self._carry_flag = bool(value & 0x1)
-        self._zero_flag = not result
-        self._negative_flag = bool(result & 0x80)
-        return result
+def _logical(operator):
+    """
+    Generate the code of a logical operation on the accumulator.
 
-    def _ora(self, addr):
-        """
-        Update the accumulator with the result of accumulator | value
+    :param str operator: Operator applied on the accumulator and ``value``.
 
-        :param int value: Value to or with.
-        """
-        value = self._read_byte(addr)
-        self._accumulator = self._accumulator | value
-        self._zero_flag = not self._accumulator
-        self._negative_flag = bool(self._accumulator & 0x80)
+    :returns: Code updating the accumulator.
+    """
+    return _code(f"value {operator}= self._accumulator", _load("self._accumulator"))
 
-    def _eor(self, addr):
-        """
-        Update the accumulator with the result of accumulator ^ value
 
-        :param int value: Value to exclusive or with.
-        """
-        value = self._read_byte(addr)
-        self._accumulator = self._accumulator ^ value
-        self._zero_flag = not self._accumulator
-        self._negative_flag = bool(self._accumulator & 0x80)
+def _compare(register):
+    """
+    Generate the code of a compare operation.
 
-    def _and(self, addr):
-        """
-        Update the accumulator with the result of accumulator & value
+    :param str register: Register to compare ``value`` with.
 
-        :param int value: Value to and with.
-        """
-        value = self._read_byte(addr)
-        self._accumulator = self._accumulator & value
-        self._zero_flag = not self._accumulator
-        self._negative_flag = bool(self._accumulator & 0x80)
+    :returns: Code updating the flags.
+    """
+    return _code(
+        # The carry is set when the register is greater or equal to the value. Offsetting
+        # the difference by 0x100 moves the carry in bit 8, so it can be shifted into place
+        # instead of comparing the difference with 0.
+        f"result = {register} - value + 0x100",
+        _update_flags(CARRY | ZERO | NEGATIVE, "_NZ[result & 0xFF] | (result >> 8)"),
+    )
 
-    def _increment(self, value):
-        """
-        Increment a value and returns the result.
 
-        This is usually used during a read-modify-write instruction.
+def _shift(table):
+    """
+    Generate the code of a shift or rotate operation.
 
-        :param int value: Value to increment.
+    :param str table: Name of the table holding the results of the operation.
 
-        :returns: The incremened value.
-        """
-        result = (value + 1) & 0xFF
-        self._zero_flag = not result
-        self._negative_flag = bool(result & 0x80)
-        return result
+    :returns: Code computing ``result`` from ``value``.
+    """
+    return _code(
+        f"packed = {table}[(value << 1) | (self._p & {CARRY:#04x})]",
+        "result = packed & 0xFF",
+        _update_flags(CARRY | ZERO | NEGATIVE, "packed >> 8"),
+    )
 
-    def _decrement(self, value):
-        """
-        Decrement a value and returns the result.
 
-        This is usually used during a read-modify-write instruction.
+def _add_with_carry(value):
+    """
+    Generate the code adding a value and the carry to the accumulator.
 
-        :param int value: Value to decrement.
+    :param str value: Expression of the value to add.
 
-        :returns: The decremented value.
-        """
-        result = (value - 1) & 0xFF
-        self._zero_flag = not result
-        self._negative_flag = bool(result & 0x80)
-        return result
+    :returns: Code updating the accumulator and the flags.
+    """
+    return _code(
+        f"packed = _ADC[(self._accumulator << 9) | ({value} << 1) | (self._p & {CARRY:#04x})]",
+        "self._accumulator = packed & 0xFF",
+        _update_flags(CARRY | ZERO | OVERFLOW | NEGATIVE, "packed >> 8"),
+    )
 
-    def _cmp(self, first, addr):
-        """
-        Compare two values and sets the flags accordingly.
 
-        :param int first: First value to compare.
-        :param int second: Second value to compare.
-        """
-        second = self._read_byte(addr)
-        self._zero_flag = first == second
-        self._carry_flag = second <= first
-        self._negative_flag = bool((first - second) & 0x80)
+def _on_register(register, operation):
+    """
+    Generate the code of a read-modify-write operation on a register.
 
-    def _adc(self, addr):
-        """
-        Add the accumulator to the passed in value using the carry flag and update the accumulator.
+    :param str register: Register to operate on.
+    :param str operation: Code computing ``result`` from ``value``.
 
-        :param int value: Value to add.
-        """
-        value = self._read_byte(addr)
-        result = value + self._accumulator + int(self._carry_flag)
-        signed_result = (
-            self._signed(value) + self._signed(self._accumulator) + int(self._carry_flag)
-        )
-        self._carry_flag = result > 255
-        self._accumulator = result & 0xFF
-        self._zero_flag = not self._accumulator
-        self._overflow_flag = signed_result < -128 or signed_result > 127
-        self._negative_flag = bool(result & 0x80)
+    :returns: Code updating the register.
+    """
+    return _code(f"value = {register}", operation, f"{register} = result")
 
-    def _sbc(self, addr):
-        """
-        Substract the passed in value and the carry flag from the accumulator and update the
-        accumulator.
 
-        :param int value: Value to add.
-        """
-        value = self._read_byte(addr)
-        # I gave up trying to understand this operand, so I copied code from Nintendulator.
-        # https://github.com/quietust/nintendulator/blob/master/src/CPU.cpp#L805-L813
-        result = self._accumulator + (value ^ 0xFF) + int(self._carry_flag)
-        self._overflow_flag = bool(
-            (self._accumulator ^ value) & (self._accumulator ^ result) & 0x80
-        )
-        self._carry_flag = bool(result & 0x100)
-        self._accumulator = result & 0xFF
-        self._zero_flag = self._accumulator == 0
-        self._negative_flag = bool(self._accumulator & 0x80)
+# Code of the operations, using the same names as the 6502 assembly. Each operation is
+# described by its kind, which tells how the addressing mode is combined with it, and the code
+# operating on the data. The kinds are:
+#
+# - implied: the code doesn't use memory and the instruction takes an extra cycle.
+# - branch: the code is a condition telling whether the branch is taken.
+# - address: the code uses the address in ``addr``.
+# - read: the code uses the byte read at the address in ``value``.
+# - store: the code is an expression of the byte written at the address.
+# - rmw: the code computes ``result`` from ``value``, which is read at the address and
+#   then written back.
+_INC = _code("result = _INC8[value]", _update_nz("result"))
+_DEC = _code("result = _DEC8[value]", _update_nz("result"))
+_OPERATIONS = {
+    # Nop. It ticks!
+    "NOP": ("implied", ""),
+    # Status register modifiers
+    "SEI": ("implied", _set_flag(INTERRUPT_DISABLED)),
+    "CLI": ("implied", _clear_flag(INTERRUPT_DISABLED)),
+    "SED": ("implied", _set_flag(DECIMAL_MODE)),
+    "CLD": ("implied", _clear_flag(DECIMAL_MODE)),
+    "SEC": ("implied", _set_flag(CARRY)),
+    "CLC": ("implied", _clear_flag(CARRY)),
+    "CLV": ("implied", _clear_flag(OVERFLOW)),
+    # Jump
+    "JMP": ("address", "self.program_counter = addr"),
+    # Stores
+    "STA": ("store", "self._accumulator"),
+    "STX": ("store", "self._index_x"),
+    "STY": ("store", "self._index_y"),
+    # Loads
+    "LDA": ("read", _load("self._accumulator")),
+    "LDX": ("read", _load("self._index_x")),
+    "LDY": ("read", _load("self._index_y")),
+    "TAX": ("implied", _transfer("self._accumulator", "self._index_x")),
+    "TAY": ("implied", _transfer("self._accumulator", "self._index_y")),
+    "TSX": ("implied", _transfer("self.stack_pointer", "self._index_x")),
+    "TXA": ("implied", _transfer("self._index_x", "self._accumulator")),
+    "TYA": ("implied", _transfer("self._index_y", "self._accumulator")),
+    "TXS": ("implied", "self.stack_pointer = self._index_x"),
+    # Branching
+    "BNE": ("branch", _is_clear(ZERO)),
+    "BEQ": ("branch", _is_set(ZERO)),
+    "BCC": ("branch", _is_clear(CARRY)),
+    "BCS": ("branch", _is_set(CARRY)),
+    "BPL": ("branch", _is_clear(NEGATIVE)),
+    "BMI": ("branch", _is_set(NEGATIVE)),
+    "BVC": ("branch", _is_clear(OVERFLOW)),
+    "BVS": ("branch", _is_set(OVERFLOW)),
+    # Bitwise operators
+    "BIT": (
+        "read",
+        # Bits 6 and 7 of the value go into the overflow and negative flags.
+        _update_flags(
+            OVERFLOW | ZERO | NEGATIVE,
+            f"(value & {OVERFLOW | NEGATIVE:#04x}) "
+            f"| (_NZ[self._accumulator & value] & {ZERO:#04x})",
+        ),
+    ),
+    "ASL": ("rmw", _shift("_ASL")),
+    "LSR": ("rmw", _shift("_LSR")),
+    "ROL": ("rmw", _shift("_ROL")),
+    "ROR": ("rmw", _shift("_ROR")),
+    "ORA": ("read", _logical("|")),
+    "EOR": ("read", _logical("^")),
+    "AND": ("read", _logical("&")),
+    # Arithmetic
+    "INC": ("rmw", _INC),
+    "DEC": ("rmw", _DEC),
+    # Increments and decrements of the index registers waste a cycle, not documented why.
+    "INX": ("implied", _on_register("self._index_x", _INC)),
+    "INY": ("implied", _on_register("self._index_y", _INC)),
+    "DEX": ("implied", _on_register("self._index_x", _DEC)),
+    "DEY": ("implied", _on_register("self._index_y", _DEC)),
+    "CMP": ("read", _compare("self._accumulator")),
+    "CPX": ("read", _compare("self._index_x")),
+    "CPY": ("read", _compare("self._index_y")),
+    "ADC": ("read", _add_with_carry("value")),
+    # Substracting a value is the same as adding its complement.
+    "SBC": ("read", _add_with_carry("(value ^ 0xFF)")),
+}
+
+# The operand of a branch is read first, so the program counter points to the next instruction
+# when the offset is added to it.
+_BRANCH = _code(
+    "pc = self.program_counter",
+    "offset = _SIGNED_BYTE[read_byte(pc)]",
+    "pc = (pc + 1) & 0xFFFF",
+    "if {condition}:",
+    "    destination = (pc + offset) & 0xFFFF",
+    "    if (pc ^ destination) & 0xFF00:",
+    "        self._nb_cycles += 3",
+    "    else:",
+    "        self._nb_cycles += 2",
+    "    pc = destination",
+    "else:",
+    "    self._nb_cycles += 1",
+    "self.program_counter = pc",
+)
+
+# Opcodes with a generated handler, along with their operation and addressing mode.
+_GENERATED_OPCODES = [
+    (0xEA, "NOP", "implied"),
+    ############################################################################################
+    # Status register modifiers
+    (0x78, "SEI", "implied"),
+    (0x58, "CLI", "implied"),
+    (0xF8, "SED", "implied"),
+    (0xD8, "CLD", "implied"),
+    (0x18, "CLC", "implied"),
+    (0x38, "SEC", "implied"),
+    (0xB8, "CLV", "implied"),
+    ############################################################################################
+    # Jump instructions
+    (0x4C, "JMP", "absolute"),
+    ############################################################################################
+    # Store operands
+    # Y -> Memory
+    (0x84, "STY", "zero_page"),
+    (0x94, "STY", "zero_page_x"),
+    (0x8C, "STY", "absolute"),
+    # X -> Memory
+    (0x86, "STX", "zero_page"),
+    (0x96, "STX", "zero_page_y"),
+    (0x8E, "STX", "absolute"),
+    # Accumulator -> Memory
+    (0x85, "STA", "zero_page"),
+    (0x95, "STA", "zero_page_x"),
+    (0x8D, "STA", "absolute"),
+    (0x9D, "STA", "absolute_x_write"),
+    (0x99, "STA", "absolute_y_write"),
+    (0x81, "STA", "indirect_x"),
+    (0x91, "STA", "indirect_y_write"),
+    ############################################################################################
+    # Loads opcodes
+    # Accumulator <- X|Y|Memory
+    (0x98, "TYA", "implied"),
+    (0x8A, "TXA", "implied"),
+    (0xA9, "LDA", "immediate"),
+    (0xA5, "LDA", "zero_page"),
+    (0xB5, "LDA", "zero_page_x"),
+    (0xAD, "LDA", "absolute"),
+    (0xBD, "LDA", "absolute_x"),
+    (0xB9, "LDA", "absolute_y"),
+    (0xA1, "LDA", "indirect_x"),
+    (0xB1, "LDA", "indirect_y"),
+    # Y <- Memory|Accumulator
+    (0xA0, "LDY", "immediate"),
+    (0xA4, "LDY", "zero_page"),
+    (0xB4, "LDY", "zero_page_x"),
+    (0xAC, "LDY", "absolute"),
+    (0xBC, "LDY", "absolute_x"),
+    (0xA8, "TAY", "implied"),
+    # X <- Memory|Accumulator|Stack Pointer
+    (0xA2, "LDX", "immediate"),
+    (0xA6, "LDX", "zero_page"),
+    (0xB6, "LDX", "zero_page_y"),
+    (0xAE, "LDX", "absolute"),
+    (0xBE, "LDX", "absolute_y"),
+    (0xAA, "TAX", "implied"),
+    (0xBA, "TSX", "implied"),
+    # SP <- X
+    (0x9A, "TXS", "implied"),
+    ############################################################################################
+    # Branching
+    (0xD0, "BNE", "relative"),
+    (0xF0, "BEQ", "relative"),
+    (0x90, "BCC", "relative"),
+    (0xB0, "BCS", "relative"),
+    (0x10, "BPL", "relative"),
+    (0x30, "BMI", "relative"),
+    (0x50, "BVC", "relative"),
+    (0x70, "BVS", "relative"),
+    ############################################################################################
+    # Bitwise operators
+    # Bit testing
+    (0x24, "BIT", "zero_page"),
+    (0x2C, "BIT", "absolute"),
+    # Shift left
+    (0x0A, "ASL", "accumulator"),
+    (0x06, "ASL", "zero_page"),
+    (0x16, "ASL", "zero_page_x"),
+    (0x0E, "ASL", "absolute"),
+    (0x1E, "ASL", "absolute_x_write"),
+    # Shift right
+    (0x4A, "LSR", "accumulator"),
+    (0x46, "LSR", "zero_page"),
+    (0x56, "LSR", "zero_page_x"),
+    (0x4E, "LSR", "absolute"),
+    (0x5E, "LSR", "absolute_x_write"),
+    # Rotate left
+    (0x2A, "ROL", "accumulator"),
+    (0x26, "ROL", "zero_page"),
+    (0x36, "ROL", "zero_page_x"),
+    (0x2E, "ROL", "absolute"),
+    (0x3E, "ROL", "absolute_x_write"),
+    # Rotate Right
+    (0x6A, "ROR", "accumulator"),
+    (0x66, "ROR", "zero_page"),
+    (0x76, "ROR", "zero_page_x"),
+    (0x6E, "ROR", "absolute"),
+    (0x7E, "ROR", "absolute_x_write"),
+    # OR
+    (0x09, "ORA", "immediate"),
+    (0x05, "ORA", "zero_page"),
+    (0x15, "ORA", "zero_page_x"),
+    (0x0D, "ORA", "absolute"),
+    (0x1D, "ORA", "absolute_x"),
+    (0x19, "ORA", "absolute_y"),
+    (0x01, "ORA", "indirect_x"),
+    (0x11, "ORA", "indirect_y"),
+    # Exclusive OR
+    (0x49, "EOR", "immediate"),
+    (0x45, "EOR", "zero_page"),
+    (0x55, "EOR", "zero_page_x"),
+    (0x4D, "EOR", "absolute"),
+    (0x5D, "EOR", "absolute_x"),
+    (0x59, "EOR", "absolute_y"),
+    (0x41, "EOR", "indirect_x"),
+    (0x51, "EOR", "indirect_y"),
+    # AND
+    (0x29, "AND", "immediate"),
+    (0x25, "AND", "zero_page"),
+    (0x35, "AND", "zero_page_x"),
+    (0x2D, "AND", "absolute"),
+    (0x3D, "AND", "absolute_x"),
+    (0x39, "AND", "absolute_y"),
+    (0x21, "AND", "indirect_x"),
+    (0x31, "AND", "indirect_y"),
+    ############################################################################################
+    # Arithmetic
+    # Increment
+    (0xE6, "INC", "zero_page"),
+    (0xF6, "INC", "zero_page_x"),
+    (0xEE, "INC", "absolute"),
+    (0xFE, "INC", "absolute_x_write"),
+    (0xE8, "INX", "implied"),
+    (0xC8, "INY", "implied"),
+    # Decrement
+    (0xCA, "DEX", "implied"),
+    (0x88, "DEY", "implied"),
+    (0xC6, "DEC", "zero_page"),
+    (0xD6, "DEC", "zero_page_x"),
+    (0xCE, "DEC", "absolute"),
+    (0xDE, "DEC", "absolute_x_write"),
+    # Compare
+    (0xE0, "CPX", "immediate"),
+    (0xE4, "CPX", "zero_page"),
+    (0xEC, "CPX", "absolute"),
+    (0xC0, "CPY", "immediate"),
+    (0xC4, "CPY", "zero_page"),
+    (0xCC, "CPY", "absolute"),
+    (0xC9, "CMP", "immediate"),
+    (0xC5, "CMP", "zero_page"),
+    (0xD5, "CMP", "zero_page_x"),
+    (0xCD, "CMP", "absolute"),
+    (0xDD, "CMP", "absolute_x"),
+    (0xD9, "CMP", "absolute_y"),
+    (0xC1, "CMP", "indirect_x"),
+    (0xD1, "CMP", "indirect_y"),
+    # Add
+    (0x69, "ADC", "immediate"),
+    (0x65, "ADC", "zero_page"),
+    (0x75, "ADC", "zero_page_x"),
+    (0x6D, "ADC", "absolute"),
+    (0x7D, "ADC", "absolute_x"),
+    (0x79, "ADC", "absolute_y"),
+    (0x61, "ADC", "indirect_x"),
+    (0x71, "ADC", "indirect_y"),
+    # Substract
+    (0xE9, "SBC", "immediate"),
+    (0xE5, "SBC", "zero_page"),
+    (0xF5, "SBC", "zero_page_x"),
+    (0xED, "SBC", "absolute"),
+    (0xFD, "SBC", "absolute_x"),
+    (0xF9, "SBC", "absolute_y"),
+    (0xE1, "SBC", "indirect_x"),
+    (0xF1, "SBC", "indirect_y"),
+]
+
+
+def _generate_handler_code(name, mnemonic, address_mode):
+    """
+    Generate the source code of an opcode handler.
 
-    def _rmw_memory(self, addr, instruction):
-        """
-        Read a byte from memory, operates on the retrieved byte and writes it
-        back to memory.
+    :param str name: Name of the handler function.
+    :param str mnemonic: Operation executed by the handler.
+    :param str address_mode: Addressing mode of the operation.
 
-        :param int addr: Address to read/write to.
-        :param callable instruction: Method that will operate on the byte.
-        """
-        value = self._read_byte(addr)
-        # Write the byte back to the source before executing the instruction.
-        self._write_byte(addr, value)
-        self._write_byte(addr, instruction(value))
+    :returns: The source code of the function.
+    """
+    kind, operation = _OPERATIONS[mnemonic]
+    if kind == "implied":
+        body = _code(operation, "self._nb_cycles += 1")
+    elif kind == "branch":
+        body = _BRANCH.format(condition=operation)
+    elif address_mode == "accumulator":
+        # RMW instructions always waste a cycle writing back the original
+        # value back to the memory location. For the accumulator, we can
+        # simply tick.
+        body = _code(_on_register("self._accumulator", operation), "self._nb_cycles += 1")
+    else:
+        address, nb_cycles = _ADDRESS_MODES[address_mode]
+        if kind == "address":
+            body = _code(address, f"self._nb_cycles += {nb_cycles}", operation)
+        elif kind == "read":
+            body = _code(
+                address, "value = read_byte(addr)", f"self._nb_cycles += {nb_cycles + 1}", operation
+            )
+        elif kind == "store":
+            body = _code(
+                address,
+                f"self._nb_cycles += {nb_cycles}",
+                f"write_byte(addr, {operation})",
+                "self._nb_cycles += 1",
+            )
+        else:
+            body = _code(
+                address,
+                "value = read_byte(addr)",
+                f"self._nb_cycles += {nb_cycles + 1}",
+                # Write the byte back to the source before executing the instruction.
+                "write_byte(addr, value)",
+                "self._nb_cycles += 1",
+                operation,
+                "write_byte(addr, result)",
+                "self._nb_cycles += 1",
+            )
+
+    lines = [f"def {name}(self):"]
+    if "read_byte(" in body:
+        lines.append("    read_byte = self._bus_read_byte")
+    if "read_word(" in body:
+        lines.append("    read_word = self._bus_read_word")
+    if "read_word_wraparound(" in body:
+        lines.append("    read_word_wraparound = self._bus_read_word_wraparound")
+    if "write_byte(" in body:
+        lines.append("    write_byte = self._bus_write_byte")
+    lines.extend(f"    {line}" for line in body.splitlines())
+    return _code(*lines)
+
+
+def _generate_handlers():
+    """
+    Generate the handlers listed in _GENERATED_OPCODES.
 
-    def _rmw_index_x(self, instruction):
-        """
-        Run an instruction on the X register and store the result in X.
+    :returns: Dictionary of handlers indexed by opcode.
+    """
+    names = {}
+    sources = []
+    for opcode, mnemonic, address_mode in _GENERATED_OPCODES:
+        name = f"_op_{opcode:02X}_{mnemonic.lower()}_{address_mode}"
+        names[opcode] = name
+        sources.append(_generate_handler_code(name, mnemonic, address_mode))
+    source = "\n\n".join(sources) + "\n"
 
-        :param callable instruction: Method that will operate on the register.
-        """
-        self._index_x = instruction(self._index_x)
-        # Waste a cycle, not documented why.
-        self._tick()
+    # Register the source so tracebacks can show the generated code.
+    filename = "<emnes.cpu generated opcodes>"
+    linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
 
-    def _rmw_index_y(self, instruction):
-        """
-        Run an instruction on the Y register and store the result in Y.
+    namespace = {}
+    exec(compile(source, filename, "exec"), globals(), namespace)
+    return {opcode: namespace[name] for opcode, name in names.items()}
 
-        :param callable instruction: Method that will operate on the register.
-        """
-        self._index_y = instruction(self._index_y)
-        # Waste a cycle, not documented why.
-        self._tick()
 
-    def _rmw_accumulator(self, instruction):
-        """
-        Run an instruction on the accumulator and store the result in the
-        accumulator.
+def _build_dispatch_table():
+    """
+    Build the table of opcode handlers.
 
-        :param callable instruction: Method that will operate on the register.
-        """
-        # RMW instructions always waste a cycle writing back the original
-        # value back to the memory location. For the accumulator, we can
-        # simply tick.
-        self._tick()
-        self._accumulator = instruction(self._accumulator)
+    :returns: Tuple of 256 handlers, indexed by opcode.
+    """
+    # Prefill the array with the unknown opcode handler. We'll them replace
+    # them with real instructions.
+    table = [CPU._unknown_opcode] * 256
 
-    def _signed(self, value):
-        """
-        Turn an unsigned byte into a signed value.
+    for opcode, handler in _generate_handlers().items():
+        table[opcode] = handler
 
-        Values between 0 to 127 remain the value while values between
-        128 and 255 get remapped to -128 to -1.
+    # The other instructions are methods of the CPU, registered with the _opcode decorator.
+    for method in vars(CPU).values():
+        for opcode in getattr(method, "_handled_opcodes", ()):
+            table[opcode] = method
 
-        :param value: Value to convert.
-        """
-        if value > 127:
-            return -256 + value
-        return value
+    # The table never changes once built, so make it a tuple, which is a bit faster to index.
+    return tuple(table)
 
-    def _unknown_opcode(self, opcode):
-        """
-        Raises an NotImplementedError with the opcode number.
 
-        :param int opcode: Opcode to raise the error with.
-        """
-        raise NotImplementedError(
-            f"Unknown opcode {hex(opcode)} at {hex(self._program_counter - 1)}"
-        )
+# Handlers for every opcode. They are shared between all CPU instances.
+CPU._DISPATCH = _build_dispatch_table()
@@ -102,6 +102,31 @@ pal = [
 ]
 
 
+def make_translation_tables(packed_pal):
+    """
+    Builds one bytes.translate table per byte of a packed pixel.
+
+    :param list packed_pal: The palette, with each color packed as the bytes
+        it takes in the output buffer.
+
+    :returns: List of 256 bytes long tables. Table n maps a palette index to
+        byte n of that color.
+    """
+    # Only the 6 lower bits of a pixel index the palette, so mirror it to cover every
+    # possible byte value.
+    return [
+        bytes(packed_pal[i & 0x3F][offset] for i in range(256))
+        for offset in range(len(packed_pal[0]))
+    ]
+
+
+# Tables to convert palette indices into the R, G and B planes of an RGB buffer.
+pal_rgb24_tables = make_translation_tables([bytes(color) for color in pal])
+
+# The interpreter can't change while running, so only inspect the version string once.
+is_pypy = "PyPy" in sys.version
+
+
 class EmulatorBase:
     """
     Base class of the emulator.
@@ -142,17 +167,11 @@ class EmulatorBase:
         :param array rgb_buffer: Array of RGB values, one byte per component.
         :param bytearray palette_buffer: Array of pixels with one byte per pixel.
         """
-        rgba_index = 0
-        palette_index = 0
-        for y in range(240):
-            for x in range(256):
-                color = pal[palette_buffer[palette_index]]
-
-                rgb_buffer[rgba_index] = color[0]
-                rgb_buffer[rgba_index + 1] = color[1]
-                rgb_buffer[rgba_index + 2] = color[2]
-                rgba_index += 3
-                palette_index += 1
+        # Instead of writing each component from Python, translate the whole frame
+        # into one plane per component and interleave the planes. Both steps run in C.
+        nb_bytes = len(palette_buffer) * 3
+        for offset, table in enumerate(pal_rgb24_tables):
+            rgb_buffer[offset:nb_bytes:3] = palette_buffer.translate(table)
 
     def run(self):
         """
@@ -224,7 +243,7 @@ class EmulatorBase:
         # The PyPy JIT takes a while to warm up and this means poor emulation performance for 2-3
         # seconds. To avoid this, run the rom for a bit so the JIT optimises the byte code
         # for a bit and power cycle the emulator to finally let it run.
-        if "PyPy" in sys.version and self._jit_warmup:
+        if is_pypy and self._jit_warmup:
             print("Optimising PyPy JIT")
             start = time.time()
             while time.time() - start < 5:
@@ -246,12 +265,13 @@ class EmulatorBase:
             if self._nes.is_frame_ready():
                 fps += 1
                 current_frame += 1
-                elapsed = time.time() - frame_start_time
-                if elapsed > 1.0:
-                    fps /= elapsed
-                    print(f"FPS: {fps}")
+                # Don't read the clock on every frame, the frame rate is reported
+                # every 60 frames, which is about once per second at full speed.
+                if fps == 60:
+                    now = time.time()
+                    print(f"FPS: {fps / (now - frame_start_time)}")
                     fps = 0
-                    frame_start_time = time.time()
+                    frame_start_time = now
 
                 if self._is_rendering:
                     if self._update_window() is False:
@@ -14,7 +14,36 @@ import sdl2.ext
 from docopt import docopt
 
 from emnes import NES
-from emnes.emulator_base import EmulatorBase
+from emnes.emulator_base import EmulatorBase, pal, make_translation_tables
+
+# Tables to convert palette indices into 32-bit ARGB words, laid out in memory
+# like SDL expects them.
+pal_argb8888_tables = make_translation_tables(
+    [(0xFF000000 | (r << 16) | (g << 8) | b).to_bytes(4, sys.byteorder) for r, g, b in pal]
+)
+
+# The alpha byte is the same for every color, so that plane of the frame only needs to
+# be written once. Only the color planes are updated every frame.
+alpha_offset = 3 if sys.byteorder == "little" else 0
+pal_argb8888_color_tables = [
+    (offset, table) for offset, table in enumerate(pal_argb8888_tables) if offset != alpha_offset
+]
+
+
+def _make_lookup_table(mapping, size):
+    """
+    Converts a dictionary with integer keys into a list.
+
+    :param dict mapping: Dictionary to convert.
+    :param int size: Size of the list. Must be greater than every key.
+
+    :returns: List where each key of the dictionary indexes its value. Other
+        entries are None.
+    """
+    table = [None] * size
+    for key, value in mapping.items():
+        table[key] = value
+    return table
 
 
 class AudioBuffer:
@@ -92,6 +121,12 @@ class Emulator(EmulatorBase):
         sdl2.SDL_CONTROLLER_BUTTON_DPAD_RIGHT: "right",
     }
 
+    # Scancodes and controller buttons are small integers, so index lists with them
+    # instead of hashing into the dictionaries above for every event.
+    _key_table = _make_lookup_table(_keys_to_gamepad, sdl2.SDL_NUM_SCANCODES)
+    # cbutton.button is a single byte.
+    _button_table = _make_lookup_table(_buttons_to_gamepad, 256)
+
     _audio_channel_keys = {
         sdl2.SDL_SCANCODE_1: "pulse_1",
         sdl2.SDL_SCANCODE_2: "pulse_2",
@@ -122,36 +157,41 @@ class Emulator(EmulatorBase):
             self._window.window, -1, sdl2.SDL_RENDERER_ACCELERATED
         )
 
-        # Creates a surface to draw on in the dialog
-        self._surface = sdl2.SDL_CreateRGBSurface(
-            0, 256, 240, 32, 0, 0x00FF0000, 0x0000FF00, 0x000000FF, 0xFF000000
-        )
-
-        # Creates a texture which we will apply on the surface/
+        # Creates a texture the frames are uploaded to. ARGB8888 is the native
+        # format of most renderers, so SDL won't have to convert the pixels on upload.
         self._texture = sdl2.SDL_CreateTexture(
-            self._renderer, sdl2.SDL_PIXELFORMAT_RGB24, sdl2.SDL_TEXTUREACCESS_STREAMING, 256, 240
+            self._renderer,
+            sdl2.SDL_PIXELFORMAT_ARGB8888,
+            sdl2.SDL_TEXTUREACCESS_STREAMING,
+            256,
+            240,
         )
 
-        # Array of RGB values that will be filled
-        self._img_data = bytearray(256 * 240 * 3)
+        # Array of ARGB values that will be filled
+        self._img_data = bytearray(256 * 240 * 4)
 
         # Cast into a ctypes compatible structure so we can pass the bytearray to SDL.
-        self._ctypes_img_data = (ctypes.c_byte * (256 * 240 * 3)).from_buffer(self._img_data)
-
-        # Fills the image black.
-        self._fill(self._img_data, bytearray(256 * 240))
-        try:
-            sdl2.SDL_LockSurface(self._surface)
-            ctypes.memmove(
-                self._surface.contents.pixels,
-                ctypes.addressof(self._ctypes_img_data),
-                256 * 240 * 3,
-            )
-
-        finally:
-            sdl2.SDL_UnlockSurface(self._surface)
+        self._ctypes_img_data = (ctypes.c_byte * (256 * 240 * 4)).from_buffer(self._img_data)
+        # The buffer never moves, so its address can be computed once.
+        self._img_data_address = ctypes.addressof(self._ctypes_img_data)
+
+        # Fills the image black. There's no need to go through the palette for this,
+        # a single memset clears the whole buffer. Then make every pixel opaque, _fill
+        # never touches the alpha plane.
+        ctypes.memset(self._img_data_address, 0, len(self._img_data))
+        self._img_data[alpha_offset::4] = bytes([0xFF]) * (256 * 240)
+        sdl2.SDL_UpdateTexture(self._texture, None, self._img_data_address, 256 * 4)
+
+    @staticmethod
+    def _fill(argb_buffer, palette_buffer):
+        """
+        Convert palette buffer into ARGB buffer.
 
-        sdl2.SDL_UpdateTexture(self._texture, None, self._surface.contents.pixels, 256 * 3)
+        :param array argb_buffer: Array of ARGB values, one 32-bit word per pixel.
+        :param bytearray palette_buffer: Array of pixels with one byte per pixel.
+        """
+        for offset, table in pal_argb8888_color_tables:
+            argb_buffer[offset::4] = palette_buffer.translate(table)
 
     def _update_window(self):
         """
@@ -164,22 +204,12 @@ class Emulator(EmulatorBase):
         else:
             self._nes.apu.samples
 
-        keep_running = True
-        pixels = ctypes.c_void_p()
-        pitch = ctypes.c_int32(256 * 3)
-        try:
-            sdl2.SDL_LockTexture(self._texture, None, ctypes.byref(pixels), ctypes.byref(pitch))
-
-            # ctypes is too slow on PyPy to directly update pixels, so fill an array
-            # in Python and then memcpy it.
-            # IDEA: Maybe we could use Cython here to copy the bytes directly into the
-            # texture. This wouldn't give us much of a speed boost however. The entire
-            # is_rendering block is at most about 0.02 second long. There are much
-            # bigger problems to fix.
-            self._fill(self._img_data, self._nes.ppu.pixels)
-            sdl2.SDL_memcpy(pixels, ctypes.addressof(self._ctypes_img_data), 256 * 240 * 3)
-        finally:
-            sdl2.SDL_UnlockTexture(self._texture)
+        # ctypes is too slow on PyPy to directly update pixels, so fill an array
+        # in Python and then upload it. The array is already laid out like the
+        # texture, so there's no need to lock the texture and memcpy into it, SDL
+        # can copy straight from our buffer.
+        self._fill(self._img_data, self._nes.ppu.pixels)
+        sdl2.SDL_UpdateTexture(self._texture, None, self._img_data_address, 256 * 4)
 
         sdl2.SDL_RenderCopy(self._renderer, self._texture, None, None)
         sdl2.SDL_RenderPresent(self._renderer)
@@ -191,6 +221,10 @@ class Emulator(EmulatorBase):
         """
         Updates controller state.
         """
+        # Without rendering there is no window and SDL is never initialized, so
+        # there are no events to process. Don't waste time polling for them.
+        if self._is_rendering is False:
+            return True
         # Controller state update is done inside the event pump.
         return self._event_pump()
 
@@ -204,54 +238,118 @@ class Emulator(EmulatorBase):
         """
         keep_running = True
 
+        # Fetch those once instead of for every event. They are passed down to
+        # the handlers.
+        gamepad = self._nes.gamepad
+        zapper = self._nes.zapper
+        window_multiplier = self._window_multiplier
+
+        event_handlers = self._event_handlers
         events = sdl2.ext.get_events()
         for event in events:
-            if event.type == sdl2.SDL_QUIT:
+            # Instead of comparing the event type against every event we're
+            # interested in, jump straight to the right handler.
+            handler = event_handlers.get(event.type)
+            if (
+                handler is not None
+                and handler(self, event, gamepad, zapper, window_multiplier) is False
+            ):
                 keep_running = False
-            # Keyboard handling
-            if event.type == sdl2.SDL_KEYDOWN:
-                if event.key.keysym.scancode in self._keys_to_gamepad:
-                    setattr(
-                        self._nes.gamepad, self._keys_to_gamepad[event.key.keysym.scancode], True
-                    )
-            elif event.type == sdl2.SDL_KEYUP:
-                if event.key.keysym.scancode in self._keys_to_gamepad:
-                    setattr(
-                        self._nes.gamepad, self._keys_to_gamepad[event.key.keysym.scancode], False
-                    )
-                elif event.key.keysym.scancode in self._audio_channel_keys:
-                    getattr(
-                        self._nes.apu.mixer,
-                        f"toggle_{self._audio_channel_keys[event.key.keysym.scancode]}",
-                    )()
-                elif event.key.keysym.scancode == sdl2.SDL_SCANCODE_R:
-                    self._nes.reset()
-            # Game controller handling.
-            elif event.type == sdl2.SDL_CONTROLLERDEVICEADDED:
-                # When controller is detected, add it!
-                sdl2.SDL_GameControllerOpen(event.jdevice.which)
-            elif event.type == sdl2.SDL_CONTROLLERBUTTONDOWN:
-                if event.cbutton.button in self._buttons_to_gamepad:
-                    setattr(self._nes.gamepad, self._buttons_to_gamepad[event.cbutton.button], True)
-            elif event.type == sdl2.SDL_CONTROLLERBUTTONUP:
-                if event.cbutton.button in self._buttons_to_gamepad:
-                    setattr(
-                        self._nes.gamepad, self._buttons_to_gamepad[event.cbutton.button], False
-                    )
-            # Mouse handling for zapper
-            elif event.type == sdl2.SDL_MOUSEMOTION:
-                x = event.button.x // self._window_multiplier
-                y = event.button.y // self._window_multiplier
-                self._nes.zapper.update_aim_location(x, y)
-            elif event.type == sdl2.SDL_MOUSEBUTTONDOWN:
-                if event.button.button == sdl2.SDL_BUTTON_LEFT:
-                    self._nes.zapper.trigger_pulled = True
-            elif event.type == sdl2.SDL_MOUSEBUTTONUP:
-                if event.button.button == sdl2.SDL_BUTTON_LEFT:
-                    self._nes.zapper.trigger_pulled = False
 
         return keep_running
 
+    def _on_quit(self, event, gamepad, zapper, window_multiplier):
+        """
+        Stops the emulation when the window is closed.
+
+        :returns: False, so the emulation ends.
+        """
+        return False
+
+    def _on_key_down(self, event, gamepad, zapper, window_multiplier):
+        """
+        Presses gamepad buttons.
+        """
+        button = self._key_table[event.key.keysym.scancode]
+        if button is not None:
+            setattr(gamepad, button, True)
+
+    def _on_key_up(self, event, gamepad, zapper, window_multiplier):
+        """
+        Releases gamepad buttons, toggles audio channels and resets the console.
+        """
+        button = self._key_table[event.key.keysym.scancode]
+        if button is not None:
+            setattr(gamepad, button, False)
+        elif event.key.keysym.scancode in self._audio_channel_keys:
+            getattr(
+                self._nes.apu.mixer, f"toggle_{self._audio_channel_keys[event.key.keysym.scancode]}"
+            )()
+        elif event.key.keysym.scancode == sdl2.SDL_SCANCODE_R:
+            self._nes.reset()
+
+    def _on_controller_added(self, event, gamepad, zapper, window_multiplier):
+        """
+        When controller is detected, add it!
+        """
+        sdl2.SDL_GameControllerOpen(event.jdevice.which)
+
+    def _on_controller_button_down(self, event, gamepad, zapper, window_multiplier):
+        """
+        Presses gamepad buttons.
+        """
+        button = self._button_table[event.cbutton.button]
+        if button is not None:
+            setattr(gamepad, button, True)
+
+    def _on_controller_button_up(self, event, gamepad, zapper, window_multiplier):
+        """
+        Releases gamepad buttons.
+        """
+        button = self._button_table[event.cbutton.button]
+        if button is not None:
+            setattr(gamepad, button, False)
+
+    def _on_mouse_motion(self, event, gamepad, zapper, window_multiplier):
+        """
+        Aims the zapper.
+        """
+        x = event.button.x // window_multiplier
+        y = event.button.y // window_multiplier
+        zapper.update_aim_location(x, y)
+
+    def _on_mouse_button_down(self, event, gamepad, zapper, window_multiplier):
+        """
+        Pulls the zapper's trigger.
+        """
+        if event.button.button == sdl2.SDL_BUTTON_LEFT:
+            zapper.trigger_pulled = True
+
+    def _on_mouse_button_up(self, event, gamepad, zapper, window_multiplier):
+        """
+        Releases the zapper's trigger.
+        """
+        if event.button.button == sdl2.SDL_BUTTON_LEFT:
+            zapper.trigger_pulled = False
+
+    # Maps SDL event types to the method that handles them. Handlers receive the
+    # gamepad, the zapper and the window multiplier fetched by _event_pump and
+    # return False when the emulation needs to stop.
+    _event_handlers = {
+        sdl2.SDL_QUIT: _on_quit,
+        # Keyboard handling
+        sdl2.SDL_KEYDOWN: _on_key_down,
+        sdl2.SDL_KEYUP: _on_key_up,
+        # Game controller handling.
+        sdl2.SDL_CONTROLLERDEVICEADDED: _on_controller_added,
+        sdl2.SDL_CONTROLLERBUTTONDOWN: _on_controller_button_down,
+        sdl2.SDL_CONTROLLERBUTTONUP: _on_controller_button_up,
+        # Mouse handling for zapper
+        sdl2.SDL_MOUSEMOTION: _on_mouse_motion,
+        sdl2.SDL_MOUSEBUTTONDOWN: _on_mouse_button_down,
+        sdl2.SDL_MOUSEBUTTONUP: _on_mouse_button_up,
+    }
+
     def _finalize_window(self):
         """
         Finalize SDL.
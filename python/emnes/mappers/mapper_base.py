@@ -21,6 +21,10 @@ class MapperBase:
         # state of the emulator.
         "_has_rw_vrom",
         "_rom",
+        # Offsets of the ROM banks mapped at 0x8000 and 0xC000, indexed by bit 14 of
+        # the address. The list is updated in place when banks are switched, so
+        # it can be shared with the memory bus.
+        "_rom_bank_offsets",
         "_vrom",
         "_sram",
         "_path",
@@ -33,6 +37,9 @@ class MapperBase:
         # Whenever the console needs to switch VROM memory bank, it will
         # invoke this method to update the PPU.
         "_vrom_switch_handler",
+        # Invoked with the ROM data and the bank offsets so the memory bus can
+        # read the ROM directly.
+        "_rom_switch_handler",
     ]
 
     def __init__(self, header, data):
@@ -48,15 +55,29 @@ class MapperBase:
         self._has_trainer = header.has_trainer
         self._mirroring_type = header.mirroring_type
         self._nb_sram_banks = header.nb_sram_banks
+        self._rom_bank_offsets = [
+            # By default, the lower area points to the first bank...
+            0,
+            # ... and the higher area points to the last bank, which is also the
+            # first one when there is a single bank.
+            # Note that we're going to substract 0x4000 from the bank
+            # so we don't have to remove 0x4000 of the address every single time.
+            ((header.nb_rom_banks - 1) * 16 * 1024) - 0x4000,
+        ]
         self._set_rom_and_vrom(data)
 
-    def set_handlers(self, vrom_switch_handler):
+    def set_handlers(self, vrom_switch_handler, rom_switch_handler):
         """
         Sets the handlers required to update the other
         parts of the NES when some state change inside the
         mapper.
+
+        The ROM switch handler is invoked right away with the ROM data and the
+        bank offsets.
         """
         self._vrom_switch_handler = vrom_switch_handler
+        self._rom_switch_handler = rom_switch_handler
+        self._rom_switch_handler(self._rom, self._rom_bank_offsets)
 
     def __getstate__(self):
         """
@@ -68,8 +89,9 @@ class MapperBase:
         # For some reason __slots__ only contains the slots from the
         # derived class, so we need to use Mapper.__slots__ as well...
         for k in self.__slots__ + MapperBase.__slots__:
-            # We don't want to pickle the ROM data, so skip those.
-            if k in ["_rom"] + ["_vrom"] if self._has_rw_vrom is False else []:
+            # We don't want to pickle the ROM data, so skip those. They can be
+            # reloaded from the cartridge file.
+            if k == "_rom" or (k == "_vrom" and self._has_rw_vrom is False):
                 continue
             state[k] = getattr(self, k)
         return state
@@ -94,17 +116,21 @@ class MapperBase:
         # Set back the memory for the PPU. It didn't save it's
         # pattern memory either.
         self._vrom_switch_handler(self._vrom)
+        # Same thing for the memory bus.
+        self._rom_switch_handler(self._rom, self._rom_bank_offsets)
 
     def _set_rom_and_vrom(self, data):
         """
         Splits data from the cartridge into ROM and VROM data.
 
-        :param bytes data: Data from the cartridge.
+        :param memoryview data: Data from the cartridge.
         """
         vrom_start = self.nb_rom_banks * 16 * 1024
-        self._rom = data[:vrom_start]
+        # The ROM and VROM are read for every instruction and every tile, so copy
+        # them into bytes, which are faster to index than views on the data.
+        self._rom = bytes(data[:vrom_start])
         if self._has_rw_vrom is False:
-            self._vrom = data[vrom_start:]
+            self._vrom = bytes(data[vrom_start:])
 
     @property
     def name(self):
@@ -118,9 +144,9 @@ class MapperBase:
         Reset the content of SRAM is the RAM is not battery backed.
         """
         if self._is_battery_backed is False:
-            for i in range(len(self._sram)):
-                # TODO: Pass in garbage in here.
-                self._sram[i] = 0
+            # TODO: Pass in garbage in here.
+            # Clear the whole SRAM in one go instead of one byte at a time.
+            self._sram[:] = bytes(len(self._sram))
 
     def configure(self):
         """
@@ -132,22 +158,18 @@ class MapperBase:
         self._vrom = bytearray(0x2000)
         self._vrom_switch_handler(self._vrom)
 
-    def read_sram_byte(self, addr):
+    def read_rom_array(self, addr, length):
         """
-        Read an SRAM byte.
+        Read consecutive bytes from ROM.
 
-        :param int addr: Address to read an SRAM byte from.
-        """
-        return self._sram[addr]
+        Mappers can override this to copy the bytes with a slice.
 
-    def write_sram_byte(self, addr, value):
-        """
-        Write a byte to SRAM.
+        :param int addr: Address of the first byte.
+        :param int length: Number of bytes to read.
 
-        :param int addr: Address to write a byte at.
-        :param int value: Value to write.
+        :returns: The bytes read.
         """
-        self._sram[addr] = value
+        return bytearray(self.read_rom_byte(addr + i) for i in range(length))
 
     @property
     def nb_rom_banks(self):
@@ -184,6 +206,13 @@ class MapperBase:
         """
         return self._mirroring_type
 
+    @property
+    def sram(self):
+        """
+        SRAM of the cartridge. It is cleared in place, so it can be shared.
+        """
+        return self._sram
+
     @property
     def nb_sram_banks(self):
         """
@@ -203,3 +232,11 @@ class MapperBase:
             + (512 if self.has_trainer else 0)
             + 16
         )
+
+    @property
+    def fixed_rom_mask(self):
+        """
+        Mask that turns a CPU address into an offset into the ROM, for mappers that
+        never switch ROM banks. None if the mapper switches banks.
+        """
+        return None
@@ -16,7 +16,10 @@ class MapperRegistry:
     Allows to instantiate a mapper.
     """
 
-    _mapper_registry = {0: NROMSwitch, 1: MMC1}
+    # Mapper numbers are a single byte in the iNES header, so index a list with them.
+    _mapper_registry = [None] * 256
+    _mapper_registry[0] = NROMSwitch
+    _mapper_registry[1] = MMC1
 
     @classmethod
     def create_mapper(cls, mapper_number, header, cart_data):
@@ -30,6 +33,7 @@ class MapperRegistry:
 
         :returns: Instance of a :class:`emnes.mappers.MemoryBase` derived class.
         """
-        if mapper_number not in cls._mapper_registry:
+        mapper = cls._mapper_registry[mapper_number]
+        if mapper is None:
             raise NotImplementedError(f"Mapper {mapper_number} is not implemented.")
-        return cls._mapper_registry[mapper_number](header, cart_data)
+        return mapper(header, cart_data)
@@ -19,8 +19,6 @@ class MMC1(MapperBase):
     """
 
     __slots__ = [
-        "_8000_bank_offset",
-        "_C000_bank_offset",
         # We can only write to a single register at a time, one bit at a
         # time.
         "_register_value",
@@ -39,13 +37,6 @@ class MMC1(MapperBase):
         self._register_value = 0b10000
         self._is_16kb_switching = False
 
-        # By default, the lower area points to the first bank...
-        self._8000_bank_offset = 0
-        # ... and the higher area points to the last bank.
-        # Note that we're going to substract 0x4000 from the bank
-        # so we don't have to remove 0x4000 of the address every single time.
-        self._C000_bank_offset = ((header.nb_rom_banks - 1) * 16 * 1024) - 0x4000
-
     def write_rom_byte(self, addr, value):
         """
         Write a byte into ROM.
@@ -82,38 +73,59 @@ class MMC1(MapperBase):
             return
 
         # This was the final write, so update the right register accordingly
+        self._register_writers[register](self, self._register_value)
+        self._register_value = 0b10000
+
+    def _write_control(self, value):
+        """
+        Write to the control register, which selects how the ROM banks are switched.
+
+        :param int value: Value of the register.
+        """
         # This controls a bunch of options for now. Later it will need to
         # be augmented to support CHROM swapping.
-        if register == 0:
-            self._is_low_pgrom_switching = bool(self._register_value & 0x4)
-            self._is_16kb_switching = bool(self._register_value & 0x8)
-        elif register == 1 or register == 2:
-            # assert self._register_value == 0
-            # print(f"{register} = {self._register_value}")
-            pass
-        elif register == 3:
-            bank_number = self._register_value & 0xF
-            if self._is_16kb_switching:
-                bank_offset = bank_number * 16 * 1024
-                if self._is_low_pgrom_switching:
-                    self._8000_bank_offset = bank_offset
-                else:
-                    # We're going to be indexing this via the
-                    # addr as it was passed in, so remove 0x04000
-                    # so that passing in addr 0x4000 will read byte
-                    # 0 of the bank.
-                    self._C000_bank_offset = bank_offset - 0x4000
+        self._is_low_pgrom_switching = bool(value & 0x4)
+        self._is_16kb_switching = bool(value & 0x8)
+
+    def _write_vrom_bank(self, value):
+        """
+        Write to one of the VROM bank registers. VROM bank switching is not supported.
+
+        :param int value: Value of the register.
+        """
+        # assert value == 0
+        pass
+
+    def _write_rom_bank(self, value):
+        """
+        Write to the ROM bank register, which switches the banks mapped in memory.
+
+        :param int value: Value of the register.
+        """
+        bank_number = value & 0xF
+        if self._is_16kb_switching:
+            bank_offset = bank_number * 16 * 1024
+            if self._is_low_pgrom_switching:
+                self._rom_bank_offsets[0] = bank_offset
             else:
-                # On a 32kb bank switch, bits 1-3 are read to index,
-                # so shift right to get the correct bank index.
-                # Then we'll compute the base address of each
-                # mapped bank, which will be contiguous 16kb blocks.
-                bank_number >>= 1
-                self._8000_bank_offset = bank_number * 32 * 1024
-                # Here there's no need to remove 0x4000 from the address
-                # because the memory is contiguous.
-                self._C000_bank_offset = bank_number * 32 * 1024
-        self._register_value = 0b10000
+                # We're going to be indexing this via the
+                # addr as it was passed in, so remove 0x04000
+                # so that passing in addr 0x4000 will read byte
+                # 0 of the bank.
+                self._rom_bank_offsets[1] = bank_offset - 0x4000
+        else:
+            # On a 32kb bank switch, bits 1-3 are read to index,
+            # so shift right to get the correct bank index.
+            # Then we'll compute the base address of each
+            # mapped bank, which will be contiguous 16kb blocks.
+            bank_number >>= 1
+            self._rom_bank_offsets[0] = bank_number * 32 * 1024
+            # Here there's no need to remove 0x4000 from the address
+            # because the memory is contiguous.
+            self._rom_bank_offsets[1] = bank_number * 32 * 1024
+
+    # Handlers of the four registers, indexed by bits 13 and 14 of the address.
+    _register_writers = (_write_control, _write_vrom_bank, _write_vrom_bank, _write_rom_bank)
 
     def read_rom_byte(self, addr):
         """
@@ -123,11 +135,21 @@ class MMC1(MapperBase):
 
         :returns: The byte read.
         """
-        # TODO: Change this if for a array indexing with bool(0x4000). See
-        # if that makes the code any faster. This is unlikely however,
-        # because using [] involves a function call, which is a lot slower
-        # than an IF + a comparison in Python.
-        if addr >= 0x4000:
-            return self._rom[self._C000_bank_offset + addr]
-        else:
-            return self._rom[self._8000_bank_offset + addr]
+        # Bit 14 of the address tells which bank is read, so look up its offset
+        # instead of testing which half of the ROM is accessed.
+        return self._rom[self._rom_bank_offsets[addr >> 14] + addr]
+
+    def read_rom_array(self, addr, length):
+        """
+        Read consecutive ROM bytes.
+
+        :param int addr: Address of the first byte.
+        :param int length: Number of bytes to read.
+
+        :returns: The bytes read.
+        """
+        # Only copy a slice if the bytes are all in the same bank.
+        if length and addr >> 14 == (addr + length - 1) >> 14:
+            start = self._rom_bank_offsets[addr >> 14] + addr
+            return self._rom[start : start + length]
+        return super().read_rom_array(addr, length)
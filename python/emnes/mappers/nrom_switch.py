@@ -28,11 +28,12 @@ class NROMSwitch(MapperBase):
         # If there is only one bank, the higher area
         # will simply mirror data in the lower area.
         # as such, we're only concerned with the first 0x3FFF
-
+        # Addresses are at most 0x7FFF, so the mask also works with CPU
+        # addresses, where the ROM starts at 0x8000.
         if header.nb_rom_banks == 1:
             self._address_mask = 0x3FFF
         else:
-            self._address_mask = 0xFFFF
+            self._address_mask = 0x7FFF
 
     def configure(self):
         """
@@ -62,3 +63,25 @@ class NROMSwitch(MapperBase):
         :returns: The read byte.
         """
         return self._rom[addr & self._address_mask]
+
+    def read_rom_array(self, addr, length):
+        """
+        Read consecutive rom bytes.
+
+        :param int addr: Address of the first byte.
+        :param int length: Number of bytes to read.
+
+        :returns: The read bytes.
+        """
+        start = addr & self._address_mask
+        # Only copy a slice if the bytes don't wrap around the end of the ROM.
+        if start + length <= self._address_mask + 1:
+            return self._rom[start : start + length]
+        return super().read_rom_array(addr, length)
+
+    @property
+    def fixed_rom_mask(self):
+        """
+        Mask that turns a CPU address into an offset into the ROM.
+        """
+        return self._address_mask
@@ -17,16 +17,96 @@ class MemoryBus:
         """
         self._cartridge = cartridge
         self._ram = bytearray(0x800)
+        # The cartridge's SRAM is never reallocated, so it can be accessed directly.
+        self._sram = cartridge.sram
         self._ppu = ppu
         self._ppu.memory_bus = self
         self._memory_reg = bytearray(0x20)
         self._input_device_1 = input_device_1
         self._input_device_2 = input_device_2
 
+        # Handlers for the memory regions other than RAM and ROM, indexed by the 8KB
+        # region of the address (addr >> 13). RAM and ROM are tested for first by
+        # read_byte and write_byte, so their slots are never used.
+        # The PPU only looks at the last 3 bits of the address, so its methods can
+        # be called directly.
+        self._region_readers = [
+            None,
+            ppu.read_byte,
+            self._read_register,
+            self._read_sram,
+            None,
+            None,
+            None,
+            None,
+        ]
+        self._region_writers = [
+            None,
+            ppu.write_byte,
+            self._write_register,
+            self._write_sram,
+            None,
+            None,
+            None,
+            None,
+        ]
+
+        # When the cartridge never switches ROM banks, a mask is all that is needed
+        # to find a byte in ROM, so use a read_byte specialized for it. This is looked
+        # up when the CPU is created, so it has to be decided here.
+        rom_mask = cartridge.fixed_rom_mask
+        if rom_mask is not None:
+            self._rom_mask = rom_mask
+            self.read_byte = self._read_byte_fixed_rom
+
+    def __getstate__(self):
+        """
+        Captures the state of the memory bus. Used when pickling.
+
+        :returns: `dict` of the state.
+        """
+        state = self.__dict__.copy()
+        # The ROM isn't saved with the cartridge either. The cartridge will hand
+        # it back when it is unpickled.
+        del state["_rom"]
+        return state
+
+    def set_rom(self, rom, bank_offsets):
+        """
+        Sets the ROM read by the CPU.
+
+        :param bytes rom: ROM data of the cartridge.
+        :param list bank_offsets: Offsets into the ROM of the banks mapped at 0x8000
+            and 0xC000. The cartridge updates this list when switching banks.
+        """
+        self._rom = rom
+        self._rom_bank_offsets = bank_offsets
+
     def set_cpu_and_apu(self, cpu, apu):
         self._cpu = cpu
         self._apu = apu
 
+        # Handlers of the APU and I/O registers, indexed by the last 5 bits of the
+        # address. Registers without side effects are backed by _memory_reg.
+        self._register_readers = [self._read_memory_register] * 0x20
+        self._register_writers = [self._write_memory_register] * 0x20
+        for register in [*range(0x14), 0x15]:
+            self._register_readers[register] = apu.read_byte
+            self._register_writers[register] = apu.write_byte
+        self._register_writers[0x14] = self._write_oam_dma
+        self._register_readers[0x16] = self._read_input_device_1
+        self._register_writers[0x16] = self._write_input_device_1
+        self._register_readers[0x17] = self._read_input_device_2
+        self._register_writers[0x17] = self._write_input_device_2
+
+    @property
+    def ram(self):
+        """
+        Internal RAM of the console, which is mapped at 0x0000-0x07FF and mirrored up to
+        0x1FFF.
+        """
+        return self._ram
+
     def read_byte(self, addr):
         """
         Read a byte from memory.
@@ -37,26 +117,126 @@ class MemoryBus:
         """
         # Test for the two most common memory regions first.
         if addr >= 0x8000:
-            return self._cartridge.read_rom_byte(addr - 0x8000)
+            # Instructions are mostly read from ROM, so index the banks directly
+            # instead of calling into the cartridge.
+            addr -= 0x8000
+            return self._rom[self._rom_bank_offsets[addr >> 14] + addr]
+        elif addr < 0x2000:
+            addr &= 0x7FF
+            return self._ram[addr]
+        # Jump straight to the handler of the other regions instead of testing
+        # for each of them.
+        return self._region_readers[addr >> 13](addr)
+
+    def _read_byte_fixed_rom(self, addr):
+        """
+        Read a byte from memory, when the cartridge doesn't switch ROM banks.
+
+        :param int addr: Address to read a byte from.
+
+        :returns: The byte that was read.
+        """
+        if addr >= 0x8000:
+            return self._rom[addr & self._rom_mask]
         elif addr < 0x2000:
             addr &= 0x7FF
             return self._ram[addr]
-        elif addr >= 0x6000:
-            return self._cartridge.read_sram_byte(addr - 0x6000)
-        elif addr >= 0x4020:
+        return self._region_readers[addr >> 13](addr)
+
+    def _read_register(self, addr):
+        """
+        Read a byte from the APU and I/O registers or the expansion ROM.
+
+        :param int addr: Address between 0x4000 and 0x5FFF to read a byte from.
+
+        :returns: The byte that was read.
+        """
+        if addr >= 0x4020:
             self._not_implemented("Expansion ROM (0x4020-0x6000)", addr, is_read=True)
-        elif addr >= 0x4000:
-            if addr <= 0x4013 or addr == 0x4015:
-                return self._apu.read_byte(addr)
-            if addr == 0x4016:
-                return self._input_device_1.read()
-            elif addr == 0x4017:
-                return self._input_device_2.read()
-            return self._memory_reg[addr - 0x4000]
-        elif addr >= 0x2000:
-            return self._ppu.read_byte(addr & 0x2007)
-        else:
-            raise RuntimeError(f"Unexpected memory read {hex(addr)}")
+        return self._register_readers[addr - 0x4000](addr)
+
+    def _read_memory_register(self, addr):
+        """
+        Read a register that has no side effects.
+
+        :param int addr: Address of the register.
+
+        :returns: The byte that was read.
+        """
+        return self._memory_reg[addr - 0x4000]
+
+    def _read_input_device_1(self, addr):
+        """
+        Read the state of the first input device.
+
+        :param int addr: Address of the register. Unused.
+
+        :returns: The byte that was read.
+        """
+        return self._input_device_1.read()
+
+    def _read_input_device_2(self, addr):
+        """
+        Read the state of the second input device.
+
+        :param int addr: Address of the register. Unused.
+
+        :returns: The byte that was read.
+        """
+        return self._input_device_2.read()
+
+    def _read_sram(self, addr):
+        """
+        Read a byte from the cartridge's SRAM.
+
+        :param int addr: Address between 0x6000 and 0x7FFF to read a byte from.
+
+        :returns: The byte that was read.
+        """
+        return self._sram[addr - 0x6000]
+
+    def read_word(self, addr):
+        """
+        Read a word from memory.
+
+        :param int addr: Address of the low byte.
+
+        :returns: The word that was read.
+        """
+        # Operands of the instructions are mostly read from ROM, so read both bytes
+        # directly. The high byte of a word at 0xFFFF is in RAM, so leave it
+        # to read_byte.
+        if 0x8000 <= addr < 0xFFFF:
+            rom = self._rom
+            bank_offsets = self._rom_bank_offsets
+            addr -= 0x8000
+            high_addr = addr + 1
+            return rom[bank_offsets[addr >> 14] + addr] | (
+                rom[bank_offsets[high_addr >> 14] + high_addr] << 8
+            )
+        elif addr < 0x1FFF:
+            return self._ram[addr & 0x7FF] | (self._ram[(addr + 1) & 0x7FF] << 8)
+        return self.read_byte(addr) | (self.read_byte(addr + 1) << 8)
+
+    def read_word_wraparound(self, addr, mask):
+        """
+        Read a word from memory, where the address of the high byte can wrap around.
+
+        The address of the high byte is found by incrementing only the bits of the address
+        selected by the mask. A mask of 0xFF keeps both bytes on the same page, which is
+        how the 6502 reads zero page pointers and the target of indirect jumps.
+
+        :param int addr: Address of the low byte.
+        :param int mask: Bits of the address that are incremented to get the address
+            of the high byte.
+
+        :returns: The word that was read.
+        """
+        high_addr = (addr & ~mask) | ((addr + 1) & mask)
+        # Zero page pointers are always in RAM, so read them directly.
+        if addr < 0x2000 and high_addr < 0x2000:
+            return self._ram[addr & 0x7FF] | (self._ram[high_addr & 0x7FF] << 8)
+        return self.read_byte(addr) | (self.read_byte(high_addr) << 8)
 
     def read_array(self, addr, length):
         """
@@ -67,6 +247,16 @@ class MemoryBus:
 
         :returns: The bytes that were read.
         """
+        end = addr + length
+        # Copy a slice when all the bytes are in the same memory instead of
+        # reading them one at a time.
+        if addr >= 0x8000 and end <= 0x10000:
+            return self._cartridge.read_rom_array(addr - 0x8000, length)
+        elif addr < 0x2000 and (addr & 0x7FF) + length <= 0x800:
+            addr &= 0x7FF
+            return self._ram[addr : addr + length]
+        elif addr >= 0x6000 and end <= 0x8000:
+            return self._sram[addr - 0x6000 : end - 0x6000]
         result = bytearray(length)
         for i in range(length):
             result[i] = self.read_byte(i + addr)
@@ -85,26 +275,68 @@ class MemoryBus:
         elif addr < 0x2000:
             addr &= 0x7FF
             self._ram[addr] = value
-        elif addr >= 0x6000:
-            self._cartridge.write_sram_byte(addr - 0x6000, value)
-        elif addr >= 0x4020:
-            self._not_implemented("Expansion ROM (0x4020-0x6000)", addr, is_read=False)
-        elif addr >= 0x4000:
-            if addr <= 0x4013 or addr == 0x4015:
-                self._apu.write_byte(addr, value)
-            if addr == 0x4014:
-                self._cpu.dma_transfer(value)
-            elif addr == 0x4016:
-                self._input_device_1.write(value)
-            elif addr == 0x4017:
-                self._input_device_2.write(value)
-                self._apu.write_byte(addr, value)
-            else:
-                self._memory_reg[addr - 0x4000] = value
-        elif addr >= 0x2000:
-            self._ppu.write_byte(addr & 0x2007, value)
         else:
-            raise RuntimeError(f"Unexpected memory write at {hex(addr)}")
+            # Jump straight to the handler of the other regions instead of testing
+            # for each of them.
+            self._region_writers[addr >> 13](addr, value)
+
+    def _write_register(self, addr, value):
+        """
+        Write a byte to the APU and I/O registers or the expansion ROM.
+
+        :param int addr: Address between 0x4000 and 0x5FFF to write a byte to.
+        :param int value: Value of the byte to write.
+        """
+        if addr >= 0x4020:
+            self._not_implemented("Expansion ROM (0x4020-0x6000)", addr, is_read=False)
+        self._register_writers[addr - 0x4000](addr, value)
+
+    def _write_memory_register(self, addr, value):
+        """
+        Write a register that has no side effects.
+
+        :param int addr: Address of the register.
+        :param int value: Value of the byte to write.
+        """
+        self._memory_reg[addr - 0x4000] = value
+
+    def _write_oam_dma(self, addr, value):
+        """
+        Launch a DMA transfer to the PPU's OAM memory.
+
+        :param int addr: Address of the register. Unused.
+        :param int value: High byte of the address to copy from.
+        """
+        self._cpu.dma_transfer(value)
+
+    def _write_input_device_1(self, addr, value):
+        """
+        Write to the first input device.
+
+        :param int addr: Address of the register. Unused.
+        :param int value: Value of the byte to write.
+        """
+        self._input_device_1.write(value)
+
+    def _write_input_device_2(self, addr, value):
+        """
+        Write to the second input device. The APU's frame counter shares this
+        register.
+
+        :param int addr: Address of the register.
+        :param int value: Value of the byte to write.
+        """
+        self._input_device_2.write(value)
+        self._apu.write_byte(addr, value)
+
+    def _write_sram(self, addr, value):
+        """
+        Write a byte to the cartridge's SRAM.
+
+        :param int addr: Address between 0x6000 and 0x7FFF to write a byte to.
+        :param int value: Value of the byte to write.
+        """
+        self._sram[addr - 0x6000] = value
 
     def _not_implemented(self, region, addr, is_read):
         """
@@ -7,6 +7,9 @@
 
 import enum
 
+# Names of the mirroring types, indexed by value.
+_NAMES = ("horizontal", "vertical", "four screen")
+
 
 class MirroringType(enum.IntEnum):
     """
@@ -27,9 +30,4 @@ class MirroringType(enum.IntEnum):
 
         :param str format_spec: Format specifier. Unused.
         """
-        if self.value == self.Horizontal:
-            return "horizontal"
-        elif self.value == self.Vertical:
-            return "vertical"
-        else:
-            return "four screen"
+        return _NAMES[self]
@@ -38,8 +38,9 @@ class NES:
         self._ppu = None
         self._cpu = None
         self._apu = None
-        # Flag raised when the emulation pauses because a new frame has been rendered.
-        self._frame_ready = False
+        # Flag raised by the PPU when the emulation pauses because a new frame has
+        # been rendered. It is shared with the PPU, which sets it directly.
+        self._frame_ready_flag = bytearray(1)
         # Flag raised when the emulation pauses to request an update to the controller
         # inputs.
         self._input_requested = False
@@ -63,17 +64,25 @@ class NES:
         self._cartridge = CartridgeReader.load_from_disk(path_to_rom)
         self.power()
 
-    def _set_frame_ready(self):
+    def load_rom_data(self, rom_data, path_to_rom=None):
         """
-        Sets the _frame_ready flag.
+        Load a rom that has already been read into memory.
+
+        This allows to load the same rom multiple times without having to
+        read it from disk again.
+
+        :param bytes rom_data: Content of a .nes file.
+        :param str path_to_rom: Path the data was read from. Required for
+            save states to work, since the ROM data isn't saved with them.
         """
-        self._frame_ready = True
+        self._cartridge = CartridgeReader.load_from_data(rom_data, path_to_rom)
+        self.power()
 
     def is_frame_ready(self):
         """
         Indicates if the PPU is done rendering a frame.
         """
-        return self._frame_ready
+        return self._frame_ready_flag[0] == 1
 
     def is_input_requested(self):
         """
@@ -89,8 +98,9 @@ class NES:
         # TODO: There's a bit of circular dependency here, we should look into
         # fixing it.
         # CPU -> MemoryBus -> PPU -> CPU
-        self._ppu = PPU(self._set_frame_ready)
-        self._cartridge.set_handlers(self._ppu.set_pattern_table_memory)
+        self._ppu = PPU(self._frame_ready_flag)
+        self._memory_bus = MemoryBus(self._cartridge, self._ppu, self._gamepad, self._zapper)
+        self._cartridge.set_handlers(self._ppu.set_pattern_table_memory, self._memory_bus.set_rom)
         self._cartridge.configure()
 
         assert self._cartridge.mirroring_type in [MirroringType.Horizontal, MirroringType.Vertical]
@@ -105,7 +115,6 @@ class NES:
             0xF7FF if self._cartridge.mirroring_type == MirroringType.Vertical else 0xFBFF
         )
 
-        self._memory_bus = MemoryBus(self._cartridge, self._ppu, self._gamepad, self._zapper)
         self._cpu = CPU(self._ppu, self._memory_bus)
         self._apu = APU(self._memory_bus)
         self._memory_bus.set_cpu_and_apu(self._cpu, self._apu)
@@ -124,21 +133,17 @@ class NES:
         # into the scope of this method. It would remove millions of function
         # calls per second. It is the second most invoked method.
         # PPU.emulate_once is the most invoked, PPU._render_pixel is the third.
-        cycles_before = self._cpu.nb_cycles
-        self._frame_ready = False
+        self._frame_ready_flag[0] = 0
         self._input_requested = False
-        self._cpu.emulate()
-        nb_cycles = self._cpu.nb_cycles - cycles_before
+        nb_cycles = self._cpu.emulate()
 
         self._cycles_since_last_controller_poll += nb_cycles
         if self._cycles_since_last_controller_poll > 10000:
             self._input_requested = True
             self._cycles_since_last_controller_poll = 0
 
-        for i in range(nb_cycles):
-            self._ppu.emulate_once()
-            self._ppu.emulate_once()
-            self._ppu.emulate_once()
+        # The PPU runs three times faster than the CPU.
+        self._ppu.emulate(nb_cycles * 3)
 
         self._apu.emulate(nb_cycles)
 
@@ -149,11 +154,16 @@ class NES:
         Emulates until the emulator has rendered a complete frame or
         controller input should be refreshed.
         """
-        self._frame_ready = False
+        frame_ready_flag = self._frame_ready_flag
+        frame_ready_flag[0] = 0
         self._input_requested = False
-        while not self._frame_ready:
-            cycles_before = self._cpu.nb_cycles
-            self._cpu.emulate()
+        # Look up everything the loop needs once instead of on every instruction.
+        cpu_emulate = self._cpu.emulate
+        ppu_emulate = self._ppu.emulate
+        apu_emulate = self._apu.emulate
+        update_light_state = self._zapper.update_light_state
+        pixels = self._ppu.pixels
+        while not frame_ready_flag[0]:
             # The correct way to emulate PPU and APU cycles would be to emulate
             # them after each CPU tick. Unfortunately, this seems like an inefficient
             # way of doing things and the performance is much much slower.
@@ -162,7 +172,7 @@ class NES:
             # and then emulate the PPU accordingly. This isn't as precise
             # as the real hardware, but it's hopefully a good balance between
             # accuracy and speed for a Python based interpreter.
-            nb_cycles = self._cpu.nb_cycles - cycles_before
+            nb_cycles = cpu_emulate()
 
             # Every 10,000 CPU cycles we'll update the controller states,
             # so that's roughly 190 times per second, which means we get about
@@ -172,14 +182,12 @@ class NES:
                 self._input_requested = True
                 self._cycles_since_last_controller_poll = 0
 
-            for i in range(nb_cycles):
-                self._ppu.emulate_once()
-                self._ppu.emulate_once()
-                self._ppu.emulate_once()
+            # The PPU runs three times faster than the CPU.
+            ppu_emulate(nb_cycles * 3)
 
-            self._apu.emulate(nb_cycles)
+            apu_emulate(nb_cycles)
 
-            self._zapper.update_light_state(self._ppu.pixels)
+            update_light_state(pixels)
 
     @property
     def cartridge(self):
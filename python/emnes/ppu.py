@@ -5,6 +5,50 @@
 #
 # See LICENSE at the root of this project for more info.
 
+# Color index of every pixel of every possible row of a tile, so a pixel can be looked up
+# instead of being extracted from the pattern bytes. A pixel's color index is found at
+# (pattern_high << 11) | (pattern_low << 3) | bit, where bit 7 is the leftmost pixel.
+_PATTERN_PIXELS = bytes(
+    ((low >> bit) & 1) | (((high >> bit) & 1) << 1)
+    for high in range(256)
+    for low in range(256)
+    for bit in range(8)
+)
+
+# Each byte with its bits in reverse order, used to flip sprites horizontally.
+_REVERSED_BITS = bytes(int(f"{byte:08b}"[::-1], 2) for byte in range(256))
+
+# Used to clear the sprite pixels of a scanline.
+_NO_SPRITE_PIXELS = bytes(256)
+
+
+def _vram_memory_index(addr):
+    """
+    Computes where a VRAM address outside of the pattern table is stored in PPU memory.
+
+    :param int addr: Address between 0x2000 and 0x3FFF.
+
+    :returns: Index of the byte in the PPU memory.
+    """
+    # 0x2000-0x2FFF is nametable memory.
+    # 0x3000-0x3EFF is just a mirror of 0x2000-0x2EFF
+    if addr < 0x3F00:
+        # TODO: We probably need to implement mirroring here!!!
+        return addr & 0x2FFF
+    # Then 0x3F00-0x3F1F is the palette memory
+    # 0x3F20-0x3FFF is just a mirror of 0x3F00-0x3F1F
+    index = addr & 0x3F1F
+    # 3F10, 3F14, 3F18 and 3F1C are mirrors of 3F00, 3F04, 3F08 and 3F0C.
+    if index & 0x13 == 0x10:
+        index &= 0x3F0F
+    return index
+
+
+# Index in PPU memory of every VRAM address, so mirrors don't have to be tested for on
+# every access. Addresses below 0x2000 are in the pattern table, which is stored
+# separately.
+_VRAM_MEMORY_INDEXES = [0] * 0x2000 + [_vram_memory_index(addr) for addr in range(0x2000, 0x4000)]
+
 
 class PPUCtrl:
     """
@@ -44,8 +88,8 @@ class PPUCtrl:
         self.sprite_table_addr = 0x1000 if value & 0b1000 else 0x0000
         self.bg_table_addr = 0x1000 if value & 0b10000 else 0x0000
         self.sprite_height = 16 if value & 0b100000 else 8
-        self.is_output_color_ext_pins = bool(value & 0b1000000)
-        self.generate_nmi = bool(value & 0b10000000)
+        self.is_output_color_ext_pins = (value >> 6) & 1
+        self.generate_nmi = value >> 7
 
         # Insert the two least significant bits into bits 10-11.
         # See: http://wiki.nesdev.com/w/index.php/PPU_scrolling#Register_controls
@@ -126,18 +170,20 @@ class PPUMask:
 
         :param int value: New register value
         """
-        self.greyscale = bool(value & 0b1)
-        self.show_leftmost_bg = bool(value & 0b10)
-        self.show_leftmost_sprite = bool(value & 0b100)
-        self.show_bg = bool(value & 0b1000)
-        self.show_sprite = bool(value & 0b10000)
-        self.emphasize_red = bool(value & 0b100000)
-        self.emphasize_green = bool(value & 0b1000000)
-        self.emphasize_blue = bool(value & 0b10000000)
+        # Flags are stored as 0 or 1 instead of being converted to booleans.
+        self.greyscale = value & 1
+        self.show_leftmost_bg = (value >> 1) & 1
+        self.show_leftmost_sprite = (value >> 2) & 1
+        self.show_bg = (value >> 3) & 1
+        self.show_sprite = (value >> 4) & 1
+        self.emphasize_red = (value >> 5) & 1
+        self.emphasize_green = (value >> 6) & 1
+        self.emphasize_blue = value >> 7
 
         # This could have been a proprety, but it suck up a lot of CPU
-        # times according to vmprof.
-        self.is_rendering_enabled = self.show_sprite or self.show_bg
+        # times according to vmprof. Non-zero when either the background or
+        # the sprites are shown.
+        self.is_rendering_enabled = value & 0b11000
 
     def read(self):
         """
@@ -170,11 +216,8 @@ class PPUStatus:
 
         :returns: The register value.
         """
-        value = (
-            (int(self.sprite_overflow) << 5)
-            | (int(self.sprite_0_hit) << 6)
-            | (int(self.in_vblank) << 7)
-        )
+        # Booleans are integers, so they can be shifted as is.
+        value = (self.sprite_overflow << 5) | (self.sprite_0_hit << 6) | (self.in_vblank << 7)
         # This status gets reset after being read.
         self.in_vblank = False
 
@@ -230,15 +273,13 @@ class PPUAddr:
         updates the high address byte. The second write updates
         the low address byte.
         """
-        if self._ppu._written_once is False:
-            self._ppu._tmp_vram_address = ((value & 0b00111111) << 8) | (
-                self._ppu._tmp_vram_address & 0xFF
-            )
+        ppu = self._ppu
+        if ppu._written_once is False:
+            ppu._tmp_vram_address = ((value & 0b00111111) << 8) | (ppu._tmp_vram_address & 0xFF)
+            ppu._written_once = True
         else:
-            self._ppu._tmp_vram_address = (self._ppu._tmp_vram_address & 0xFF00) | value
-            self._ppu._vram_address = self._ppu._tmp_vram_address
-
-        self._ppu._written_once = not self._ppu._written_once
+            ppu._tmp_vram_address = ppu._vram_address = (ppu._tmp_vram_address & 0xFF00) | value
+            ppu._written_once = False
 
     def __format__(self, style):
         """
@@ -273,39 +314,28 @@ class PPUData:
         """
         Read a byte from the PPU.
         """
-        addr = self._ppu._vram_address & 0b11111111111111
+        ppu = self._ppu
+        vram_address = ppu._vram_address
+        addr = vram_address & 0b11111111111111
 
         if addr < 0x2000:
             return_value = self._buffer
-            self._buffer = self._ppu._pattern_table_memory[addr]
+            self._buffer = ppu._pattern_table_memory[addr]
         # Then 0x2000-0x2FFF is nametable memory.
         # 0x3000-0x3EFF is just a mirror of 0x2000-0x2EFF
-        elif addr < 0x3EFF:
+        elif addr < 0x3F00:
             return_value = self._buffer
-            # TODO: We probably need to implement mirroring here!!!
-            self._buffer = self._ppu._memory[addr & 0x2FFF]
-        elif addr == 0x3F10:
-            return_value = self._ppu._memory[0x3F00]
-            self._buffer = self._ppu._memory[addr & 0x2FFF]
-        elif addr == 0x3F14:
-            return_value = self._ppu._memory[0x3F04]
-            self._buffer = self._ppu._memory[addr & 0x2FFF]
-        elif addr == 0x3F18:
-            return_value = self._ppu._memory[0x3F08]
-            self._buffer = self._ppu._memory[addr & 0x2FFF]
-        elif addr == 0x3F1C:
-            return_value = self._ppu._memory[0x3F0C]
-            self._buffer = self._ppu._memory[addr & 0x2FFF]
-        # Then 0x3F00-0x3F1F is the palette memory
-        # 0x3F20-0x3FFF is just a mirror of 0x3F00-0x3F1F
+            self._buffer = ppu._memory[_VRAM_MEMORY_INDEXES[addr]]
+        # Then 0x3F00-0x3FFF is the palette memory, with its mirrors.
         else:
+            memory = ppu._memory
             # When reading the palette, you get the right byte right
             # away, but the buffer is filled with the value of the name table
             # entry "underneath" the palette address.
-            return_value = self._ppu._memory[addr & 0x3F1F]
-            self._buffer = self._ppu._memory[addr & 0x2FFF]
+            return_value = memory[_VRAM_MEMORY_INDEXES[addr]]
+            self._buffer = memory[addr & 0x2FFF]
 
-        self._ppu._vram_address += self._ppu._ppuctrl.vram_io_addr_inc
+        ppu._vram_address = vram_address + ppu._ppuctrl.vram_io_addr_inc
 
         return return_value
 
@@ -315,31 +345,18 @@ class PPUData:
 
         :param int value: Value to write to the PPU.
         """
-        addr = self._ppu._vram_address & 0b11111111111111
+        ppu = self._ppu
+        vram_address = ppu._vram_address
+        addr = vram_address & 0b11111111111111
 
         # Lower than 0x2000 is the pattern table memory.
         if addr < 0x2000:
-            self._ppu._pattern_table_memory[addr] = value
-        # Then 0x2000-0x2FFF is nametable memory.
-        # 0x3000-0x3EFF is just a mirror of 0x2000-0x2EFF
-        elif addr < 0x3EFF:
-            # TODO: We probably need to implement mirroring here!!!
-            self._ppu._memory[addr & 0x2FFF] = value
-        # 3F10 is a mirror of 3F00
-        elif addr == 0x3F10:
-            self._ppu._memory[0x3F00] = value
-        elif addr == 0x3F14:
-            self._ppu._memory[0x3F04] = value
-        elif addr == 0x3F18:
-            self._ppu._memory[0x3F08] = value
-        elif addr == 0x3F1C:
-            self._ppu._memory[0x3F0C] = value
-        # Then 0x3F00-0x3F1F is the palette memory
-        # 0x3F20-0x3FFF is just a mirror of 0x3F00-0x3F1F
+            ppu._pattern_table_memory[addr] = value
+        # The nametables, the palette and their mirrors are all in the PPU memory.
         else:
-            self._ppu._memory[addr & 0x3F1F] = value
+            ppu._memory[_VRAM_MEMORY_INDEXES[addr]] = value
 
-        self._ppu._vram_address += self._ppu._ppuctrl.vram_io_addr_inc
+        ppu._vram_address = vram_address + ppu._ppuctrl.vram_io_addr_inc
 
 
 class PPUOamAddr:
@@ -387,8 +404,10 @@ class PPUOamData:
 
         :param int value: Value to write.
         """
-        self._ppu._oam_memory[self._ppu._ppuoamaddr.addr & 0xFF] = value
-        self._ppu._ppuoamaddr.addr += 1
+        ppuoamaddr = self._ppu._ppuoamaddr
+        addr = ppuoamaddr.addr
+        self._ppu._oam_memory[addr & 0xFF] = value
+        ppuoamaddr.addr = addr + 1
 
     def read(self):
         """
@@ -428,16 +447,18 @@ class PPUScroll:
 
         :param int value: Value of the coordinate.
         """
-        if not self._ppu._written_once:
-            self._ppu._tmp_vram_address &= 0b111111111100000
-            self._ppu._tmp_vram_address |= value >> 3
-            self._ppu._fine_x = 0b111 & value
+        ppu = self._ppu
+        if not ppu._written_once:
+            ppu._tmp_vram_address = (ppu._tmp_vram_address & 0b111111111100000) | (value >> 3)
+            ppu._fine_x = 0b111 & value
+            ppu._written_once = True
         else:
-            self._ppu._tmp_vram_address &= 0b000110000011111
-            self._ppu._tmp_vram_address |= (value & 0b111) << 12
-            self._ppu._tmp_vram_address |= (value & 0b11111000) << 2
-
-        self._ppu._written_once = not self._ppu._written_once
+            ppu._tmp_vram_address = (
+                (ppu._tmp_vram_address & 0b000110000011111)
+                | ((value & 0b111) << 12)
+                | ((value & 0b11111000) << 2)
+            )
+            ppu._written_once = False
 
     def __format__(self, style):
         """
@@ -549,8 +570,9 @@ class PPU:
 
     __slots__ = [
         ########################################################################
-        # Array of external registers the CPU can access and...
-        "_registers",
+        # Read and write methods of the external registers the CPU can access and...
+        "_register_readers",
+        "_register_writers",
         # ... then the memory registers themselves.
         "_ppuctrl",
         "_ppumask",
@@ -599,6 +621,8 @@ class PPU:
         "_name_table_byte",
         "_pattern_high_bytes",
         "_pattern_low_bytes",
+        # Offsets of the fetched tiles' pattern data in _PATTERN_PIXELS.
+        "_pattern_offsets",
         "_attribute_bytes",
         ########################################################################
         # Counts which tile is being rendered and which is being fetched.
@@ -608,15 +632,20 @@ class PPU:
         # Array of rendered pixels and
         "_pixels",
         ########################################################################
-        # When sprite data for the next line is fetched, this holds information
-        # about which sprite will be in each pixel.
-        "_sprite_priority",
+        # When sprite data for the next line is fetched, these hold the sprite pixel
+        # that will be drawn at each x coordinate:
+        # - its palette index, or 0 if there is no sprite pixel
+        # - 1 if it is drawn behind the background
+        # - 1 if it belongs to sprite zero
+        "_sprite_pixels",
+        "_sprite_behind_background",
+        "_sprite_zero_pixels",
         ########################################################################
         # Mask applied to nametable accesses.
         "_nametable_mirroring_mask",
         ########################################################################
-        # Callback invoked when a new frame is ready.
-        "_frame_ready_cb",
+        # Byte set to 1 when a new frame is ready.
+        "_frame_ready_flag",
     ]
 
     def __getstate__(self):
@@ -643,58 +672,21 @@ class PPU:
 
     # IDEA: Maybe we should turn most data from this class into a bytearray so we have something
     # we could pass down to a cython-based rendering loop.
-    class Sprite:
-        """
-        Data about a sprite.
-        """
-
-        __slots__ = (
-            ####################################################################
-            # Left coordinate of the sprite.
-            "left",
-            ########################################################################
-            # Attributes of the sprite.
-            # Bit 7: Vertical mirroring
-            # Bit 6: Horizontal mirroring
-            # Bit 5: Foreground (0) or background (1) sprite.
-            # Bit 0-1: Palette index
-            "attributes",
-            ########################################################################
-            # High byte and low bytes of the pattern data.
-            "pattern_high",
-            "pattern_low",
-            ########################################################################
-            # Indicates if this is sprite zero, aka the first sprite in OAMDATA.
-            # When set, a sprite's opaque pixel overlapping a background opaque pixel
-            # will raise the sprite zero hit flag in PPUSTATUS.
-            "is_sprite_zero",
-        )
-
-        def get_index(self, rendered_x):
-            """
-            Computes the color index in a palette.
-
-            :param int rendered_x: X coordinate of the pixel being rendered.
-            """
-            pixel_index = rendered_x - self.left
-            if self.attributes & 0b1000000:
-                selected_pixel_index = pixel_index
-            else:
-                selected_pixel_index = 7 - pixel_index
-            bit_tester = 1 << selected_pixel_index
-            return (
-                (bit_tester & self.pattern_low) | ((bit_tester & self.pattern_high) << 1)
-            ) >> selected_pixel_index
-
-    def __init__(self, frame_ready_cb=None):
+    def __init__(self, frame_ready_flag=None):
         """
         Init
+
+        :param bytearray frame_ready_flag: Single byte set to 1 when a frame has been
+            rendered. It is shared with the emulator, which is cheaper than invoking
+            a callback.
         """
-        self._frame_ready_cb = frame_ready_cb or (lambda: None)
+        self._frame_ready_flag = bytearray(1) if frame_ready_flag is None else frame_ready_flag
         self._cycle_x = 0
         self._cycle_y = 0
         self._written_once = False
-        self._sprite_priority = [None] * 256
+        self._sprite_pixels = bytearray(256)
+        self._sprite_behind_background = bytearray(256)
+        self._sprite_zero_pixels = bytearray(256)
 
         # TODO: Splits this into _nametables and _palette
         self._memory = bytearray(0x4000)
@@ -708,6 +700,7 @@ class PPU:
         self._name_table_byte = 0
         self._pattern_high_bytes = bytearray(34)
         self._pattern_low_bytes = bytearray(34)
+        self._pattern_offsets = [0] * 34
         self._attribute_bytes = bytearray(34)
         self._fine_x = 0
         self._pixels = bytearray(256 * 240)
@@ -728,7 +721,7 @@ class PPU:
         self._ppuscroll = PPUScroll(self)
         self._ppustatus = PPUStatus(self)
 
-        self._registers = [
+        registers = [
             self._ppuctrl,
             self._ppumask,
             self._ppustatus,
@@ -738,6 +731,8 @@ class PPU:
             self._ppuaddr,
             self._ppudata,
         ]
+        self._register_readers = [register.read for register in registers]
+        self._register_writers = [register.write for register in registers]
 
     @property
     def pixels(self):
@@ -860,7 +855,7 @@ class PPU:
 
         :returns: The byte read.
         """
-        return self._registers[addr & 0x7].read()
+        return self._register_readers[addr & 0x7]()
 
     def write_byte(self, addr, value):
         """
@@ -869,7 +864,7 @@ class PPU:
         :param int addr: Address of the register to write.
         :param int value: New value of the register.
         """
-        self._registers[addr & 0x7].write(value)
+        self._register_writers[addr & 0x7](value)
 
     def set_mirroring_options(self, mask):
         """
@@ -902,44 +897,21 @@ class PPU:
         """
         Emulates of PPU tick.
         """
-        # This is actually noticably faster than indexing into an array
-        # The states that occur the most often are tried out first.
-        if self._state == self.LOAD_SPRITES:
-            self._load_sprites()
-        elif self._state == self.FETCH_NAMETABLE:
-            self._fetch_nametable()
-        elif self._state == self.STORE_NAMETABLE:
-            self._store_nametable()
-        elif self._state == self.FETCH_ATTRIBUTE:
-            self._fetch_attribute()
-        elif self._state == self.STORE_ATTRIBUTE:
-            self._store_attribute()
-        elif self._state == self.FETCH_PATTERN_LOW:
-            self._fetch_pattern_low()
-        elif self._state == self.STORE_PATTERN_LOW:
-            self._store_pattern_low()
-        elif self._state == self.FETCH_PATTERN_HIGH:
-            self._fetch_pattern_high()
-        elif self._state == self.STORE_PATTERN_HIGH:
-            self._store_pattern_high()
-        elif self._state == self.IDLE_VBLANK_SCANLINES:
-            self._idle_vblank_scanlines()
-        elif self._state == self.WASTE_NAMETABLE_BYTE:
-            self._waste_nametable_byte()
-        elif self._state == self.POST_RENDER_SCANLINE:
-            self._post_render_scanline()
-        elif self._state == self.FIRST_VBLANK_SCANLINE:
-            self._first_vblank_scanline()
-        elif self._state == self.PRE_RENDER_SCANLINE_START:
-            self._pre_render_scanline_start()
-        elif self._state == self.CYCLE_0:
-            self._cycle_0()
-        elif self._state == self.LOAD_VERTICAL_SCROLL:
-            self._load_vertical_scroll()
-        elif self._state == self.WAIT_FOR_SCANLINE_TILE_FETCH:
-            self._wait_for_scanline_tile_fetch()
-        else:
-            raise RuntimeError(f"Unknown state {self._state}")
+        # Jump straight to the handler of the current state instead of comparing
+        # the state with each of them.
+        self._STATE_HANDLERS[self._state](self)
+
+    def emulate(self, nb_ticks):
+        """
+        Emulates multiple PPU ticks.
+
+        :param int nb_ticks: Number of ticks to emulate.
+        """
+        # The PPU runs three ticks per CPU cycle, so batch them here instead of
+        # having the caller look up emulate_once for each tick.
+        emulate_once = self.emulate_once
+        for i in range(nb_ticks):
+            emulate_once()
 
     # PPU states for the state machine.
     (
@@ -978,31 +950,24 @@ class PPU:
         # If rendering is disabled, there's no point evaluating any of this,
         # we'll only pick the background color.
         if self._ppumask.is_rendering_enabled:
-            # Extract the current tile's pattern data
-            bg_pattern_low = self._pattern_low_bytes[self._current_tile_rendered]
-            bg_pattern_high = self._pattern_high_bytes[self._current_tile_rendered]
-
-            # Compute the index of the bit and it's value for the given pixel.
-            # Pixel 0 is 128, pixel 1 is 64 and so on.
-            bit_tester = 1 << selected_pixel_index
-            # Add the bits. The first bit in bg_pattern_low is the lsb of a 2 bit value.
-            # The second bit in bg_pattern_high the msb.
-            bg_color_index = (
-                (bit_tester & bg_pattern_low) | ((bit_tester & bg_pattern_high) << 1)
-            ) >> selected_pixel_index
-
-            # Find the color of the pixel to render.
-            sprite = self._sprite_priority[self._cycle_x - 1]
-            sprite_color_index = sprite.get_index(self._cycle_x - 1) if sprite else 0
+            # Look up the color index of the pixel in the current tile's pattern data.
+            # Pixel 0 is bit 7, pixel 1 is bit 6 and so on.
+            bg_color_index = _PATTERN_PIXELS[
+                self._pattern_offsets[self._current_tile_rendered] | selected_pixel_index
+            ]
+
+            # Find the sprite pixel to render, if any.
+            rendered_x = self._cycle_x - 1
+            sprite_pixel = self._sprite_pixels[rendered_x]
 
             # If sprite and bg are opaque and we're rendering sprite 0, raise the flag!
-            if sprite_color_index != 0 and sprite.is_sprite_zero and bg_color_index != 0:
+            if sprite_pixel and bg_color_index and self._sprite_zero_pixels[rendered_x]:
                 self._ppustatus.sprite_0_hit = True
 
             # If the sprite's pixel is set and it should appear on top, then this is
             # the pixel to draw.
-            if sprite_color_index and (sprite.attributes & 0b100000 == 0):
-                palette_addr = 0x3F10 | ((sprite.attributes & 0b11) << 2) | sprite_color_index
+            if sprite_pixel and not self._sprite_behind_background[rendered_x]:
+                palette_addr = 0x3F00 | sprite_pixel
             # The sprite pixel is not on top, so pick the background color if it is set.
             elif bg_color_index:
                 palette_addr = (
@@ -1011,8 +976,8 @@ class PPU:
                     | bg_color_index
                 )
             # There was no background pixel, so pick the sprite pixel underneath it.
-            elif sprite_color_index:
-                palette_addr = 0x3F10 | ((sprite.attributes & 0b11) << 2) | sprite_color_index
+            elif sprite_pixel:
+                palette_addr = 0x3F00 | sprite_pixel
             # No pixel found at all, so put the back color.
             else:
                 palette_addr = 0x3F00
@@ -1226,9 +1191,13 @@ class PPU:
         Stores the high pattern byte for rendering later.
         """
         # Read the byte from memory.
-        self._pattern_high_bytes[self._current_tile_fetched] = self._pattern_table_memory[
-            self._get_pattern_addr(True)
-        ]
+        pattern_high = self._pattern_table_memory[self._get_pattern_addr(True)]
+        self._pattern_high_bytes[self._current_tile_fetched] = pattern_high
+        # Both pattern bytes are known, so find where the tile's pixels are in the
+        # lookup table once instead of on every pixel.
+        self._pattern_offsets[self._current_tile_fetched] = (pattern_high << 11) | (
+            self._pattern_low_bytes[self._current_tile_fetched] << 3
+        )
         # We've now fetch all this tile's data, so increment the current tile fetched
         self._current_tile_fetched += 1
 
@@ -1325,7 +1294,7 @@ class PPU:
         """
         # On the first cycle of the post render, raise a flag notifying that there is a frame ready.
         if self._cycle_x == 0:
-            self._frame_ready_cb()
+            self._frame_ready_flag[0] = 1
         self._cycle_x += 1
         if self._cycle_x == 341:
             self._cycle_x = 0
@@ -1343,15 +1312,14 @@ class PPU:
             # for greater accuracy, but since we're focussed on getting the code up
             # and running, keep it simple for now.
 
-            # Clear the sprite priority table, whatever happens on the next line, we don't
+            # Clear the sprite pixels, whatever happens on the next line, we don't
             # want to be caught using the previous lines tiles.
-            for x in range(256):
-                self._sprite_priority[x] = None
+            self._sprite_pixels[:] = _NO_SPRITE_PIXELS
 
             next_line = self._cycle_y + 1
 
             # No need to read sprites for line 256, there is no next line.
-            if self._ppumask.show_sprite is True and next_line < 239:
+            if self._ppumask.show_sprite and next_line < 239:
                 current_sprite_index = 0
 
                 # Read all of OAM memory and look for sprites that will be on the next scanline.
@@ -1371,19 +1339,22 @@ class PPU:
                         self._ppustatus.sprite_overflow = True
                         break
 
-                    sprite = self.Sprite()
-
                     # We need to know if this is sprite zero, so we can test the sprite zero hit.
-                    sprite.is_sprite_zero = sprite_addr == 0
+                    is_sprite_zero = sprite_addr == 0
                     # Extract pattern and attributes.
                     pattern_index = self._oam_memory[sprite_addr + 1]
 
-                    sprite.attributes = self._oam_memory[sprite_addr + 2]
+                    # Attributes of the sprite.
+                    # Bit 7: Vertical mirroring
+                    # Bit 6: Horizontal mirroring
+                    # Bit 5: Foreground (0) or background (1) sprite.
+                    # Bit 0-1: Palette index
+                    attributes = self._oam_memory[sprite_addr + 2]
 
                     # Find on which line of the sprite the next rendered line will fall.
                     fine_y = next_line - sprite_y
                     # If the sprite if flipped.
-                    if sprite.attributes & 0b10000000:
+                    if attributes & 0b10000000:
                         fine_y = (self._ppuctrl.sprite_height - 1) - fine_y
 
                     # Compute the address of the tile.
@@ -1401,25 +1372,31 @@ class PPU:
                         )
 
                     # Loads the tile data
-                    sprite.pattern_low = self._pattern_table_memory[pattern_addr]
-                    sprite.pattern_high = self._pattern_table_memory[pattern_addr + 8]
-
-                    sprite.left = self._oam_memory[sprite_addr + 3]
-
-                    # IDEA: Try to compute the palette color right away,
-                    # and save bg/foreground priority and if the pixel
-                    # is part of sprite zero.
-                    # This would mean we would compute the pixel's color
-                    # only once and not dynamically allocate Sprite objects.
-                    # If we keep making the logic more and more about bytes
-                    # we might be able to cheat and turn it into Cython code?
-
-                    # Find where this sprite lands on the scanline.
-                    for x in range(sprite.left, min(sprite.left + 8, 255)):
+                    pattern_low = self._pattern_table_memory[pattern_addr]
+                    pattern_high = self._pattern_table_memory[pattern_addr + 8]
+                    # Flip the sprite horizontally now so it doesn't have to be tested
+                    # for on every pixel.
+                    if attributes & 0b1000000:
+                        pattern_low = _REVERSED_BITS[pattern_low]
+                        pattern_high = _REVERSED_BITS[pattern_high]
+                    pattern_offset = (pattern_high << 11) | (pattern_low << 3)
+
+                    left = self._oam_memory[sprite_addr + 3]
+                    palette = 0x10 | ((attributes & 0b11) << 2)
+                    is_behind_background = (attributes >> 5) & 1
+
+                    # Find where this sprite lands on the scanline and compute the palette
+                    # index of its pixels right away, so they can simply be looked up
+                    # when rendering.
+                    for x in range(left, min(left + 8, 255)):
                         # If the sprite is opaque on that line and it's not already occupied
                         # then mark it as having priority on this line.
-                        if self._sprite_priority[x] is None and sprite.get_index(x):
-                            self._sprite_priority[x] = sprite
+                        # The leftmost pixel is bit 7.
+                        color_index = _PATTERN_PIXELS[pattern_offset | (left + 7 - x)]
+                        if color_index and not self._sprite_pixels[x]:
+                            self._sprite_pixels[x] = palette | color_index
+                            self._sprite_behind_background[x] = is_behind_background
+                            self._sprite_zero_pixels[x] = is_sprite_zero
 
                     current_sprite_index += 1
 
@@ -1486,10 +1463,9 @@ class PPU:
         if self._cycle_x == 280:
             # We only need to do this one on the pre-render scanline, doesn't really
             # matter when or in which state, so we're doing it here.
-            # Clear the sprite priority table, whatever happens on the next line, we don't
+            # Clear the sprite pixels, whatever happens on the next line, we don't
             # want to be caught using the previous lines tiles.
-            for x in range(256):
-                self._sprite_priority[x] = None
+            self._sprite_pixels[:] = _NO_SPRITE_PIXELS
             self._state = self.LOAD_VERTICAL_SCROLL
 
     def _load_vertical_scroll(self):
@@ -1517,3 +1493,24 @@ class PPU:
             # Start filling the latches with tile data.
             self._current_tile_fetched = 0
             self._state = self.FETCH_NAMETABLE
+
+    # Handlers of the states of the state machine, indexed by state.
+    _STATE_HANDLERS = (
+        _cycle_0,
+        _fetch_nametable,
+        _store_nametable,
+        _fetch_attribute,
+        _store_attribute,
+        _fetch_pattern_low,
+        _store_pattern_low,
+        _fetch_pattern_high,
+        _store_pattern_high,
+        _waste_nametable_byte,
+        _post_render_scanline,
+        _load_sprites,
+        _first_vblank_scanline,
+        _idle_vblank_scanlines,
+        _pre_render_scanline_start,
+        _load_vertical_scroll,
+        _wait_for_scanline_tile_fetch,
+    )
@@ -223,3 +223,26 @@ def test_nestest():
             print(f"Previous:")
             print(f"{previous_line}")
             raise
+
+
+def test_load_rom_data():
+    """
+    Ensures a rom loaded from memory runs the same way as one loaded from disk.
+    """
+    test_rom = os.path.dirname(__file__) + "/roms/cpu/instructions/nestest/nestest.nes"
+    from_disk = NES()
+    from_disk.load_rom(test_rom)
+
+    from_memory = NES()
+    with open(test_rom, "rb") as f:
+        from_memory.load_rom_data(f.read(), test_rom)
+
+    assert from_memory.cartridge.name == from_disk.cartridge.name
+    assert from_memory.cartridge.nb_rom_banks == from_disk.cartridge.nb_rom_banks
+
+    for i in range(1000):
+        from_disk.emulate_once()
+        from_memory.emulate_once()
+
+    assert from_memory.cpu.program_counter == from_disk.cpu.program_counter
+    assert from_memory.cpu.nb_cycles == from_disk.cpu.nb_cycles
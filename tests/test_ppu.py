@@ -175,6 +175,36 @@ def test_ppu_data_register():
     assert ppu.read_ppu_byte(0) == 0x34
 
 
+def test_ppu_data_mirrors():
+    """
+    Ensure the nametable and palette mirrors are resolved by the PPUDATA register.
+    """
+    ppu = PPU()
+    # 0x3EFF is the last mirror of the nametables.
+    ppu.ppuaddr.write(0x3E)
+    ppu.ppuaddr.write(0xFF)
+    ppu.ppudata.write(0x56)
+    assert ppu.read_ppu_byte(0x2EFF) == 0x56
+
+    # Nametable reads are buffered.
+    ppu.ppuaddr.write(0x3E)
+    ppu.ppuaddr.write(0xFF)
+    assert ppu.ppudata.read() == 0
+    ppu.ppuaddr.write(0x20)
+    ppu.ppuaddr.write(0x00)
+    assert ppu.ppudata.read() == 0x56
+
+    # 0x3F30 mirrors 0x3F10, which in turn mirrors 0x3F00.
+    ppu.ppuaddr.write(0x3F)
+    ppu.ppuaddr.write(0x30)
+    ppu.ppudata.write(0x21)
+    assert ppu.read_ppu_byte(0x3F00) == 0x21
+    # Palette reads are not buffered.
+    ppu.ppuaddr.write(0x3F)
+    ppu.ppuaddr.write(0x10)
+    assert ppu.ppudata.read() == 0x21
+
+
 @pytest.fixture
 def tile_data():
     """
@@ -485,6 +515,68 @@ def test_ppu_state():
         odd_frame = not odd_frame
 
 
+def test_ppu_emulate():
+    """
+    Test emulating multiple PPU ticks at once.
+    """
+    ppu = PPU()
+
+    ppu.ppumask.write(0xFF)
+    ppu._cycle_x = 0
+    ppu._cycle_y = 261
+    ppu.ppuctrl.write(0)
+    ppu._state = ppu.PRE_RENDER_SCANLINE_START
+
+    ppu.emulate(280)
+    assert ppu._state == ppu.LOAD_VERTICAL_SCROLL
+    ppu.emulate(25)
+    assert ppu._state == ppu.WAIT_FOR_SCANLINE_TILE_FETCH
+    assert ppu._cycle_x == 305
+
+
+def test_ppu_load_sprites():
+    """
+    Test computing the sprite pixels of the next scanline.
+    """
+    ppu = PPU()
+    pattern_table = bytearray(0x2000)
+    # Pixels of tile 1 are, from left to right: 3, 1, 2, 0, 0, 0, 0, 1
+    pattern_table[0x10] = 0b11000001
+    pattern_table[0x18] = 0b10100000
+    ppu.set_pattern_table_memory(pattern_table)
+
+    # Sprite 0 uses palette 1 and is at x = 16.
+    ppu._oam_memory[0:4] = bytes([9, 1, 0b1, 16])
+    # Sprite 1 uses palette 2, is flipped horizontally, is behind the background and
+    # overlaps sprite 0 starting at x = 20.
+    ppu._oam_memory[4:8] = bytes([9, 1, 0b1100010, 20])
+
+    ppu.ppumask.write(0x1E)
+    ppu._cycle_y = 9
+    ppu._cycle_x = 257
+    ppu._state = ppu.LOAD_SPRITES
+    ppu.emulate_once()
+
+    assert list(ppu._sprite_pixels[16:28]) == [
+        0x17,
+        0x15,
+        0x16,
+        0,
+        # Sprite 0 is transparent here, so sprite 1 shows through.
+        0x19,
+        0,
+        0,
+        0x15,
+        0,
+        0x1A,
+        0x19,
+        0x1B,
+    ]
+    assert list(ppu._sprite_zero_pixels[16:24]) == [1, 1, 1, 0, 0, 0, 0, 1]
+    assert ppu._sprite_behind_background[20] == 1
+    assert ppu._sprite_behind_background[23] == 0
+
+
 def test_ppu_scrolling():
     # This test replicates the manipulations done here:
     # http://wiki.nesdev.com/w/index.php/PPU_scrolling#Summary